@@ -32,16 +32,41 @@ OUTPUT_HEADERS = [
     "AdminInsightsPublishedAt"
 ]
 
+# Rate limiting (shared by every request this script makes)
+RATE_LIMIT_REQUESTS_PER_SECOND = 20  # Ceiling on request rate; halves on HTTP 429/503 and grows back while healthy
+RATE_LIMIT_MAX_CONCURRENCY = 8       # Ceiling on requests in flight; adapts the same way
+RATE_LIMIT_MAX_RETRIES = 5           # Retries for a throttled (429/503) request before it is returned as-is
+
+# Request tracing
+TRACE_ENABLED = True  # Collect per-request latency and stage timings and print a summary at the end of the run
+TRACE_FILE_ENABLED = False  # Also write one JSONL line per HTTP call, XML parse and pipeline stage to TRACE_PATH (large on big sites)
+TRACE_PATH = os.path.join(SHARED_FOLDER, "trace", "db_connections_flows_trace.jsonl")  # JSONL trace, one file per script
+
+# Metrics
+METRICS_FOLDER = os.environ.get("TABLEAU_METRICS_FOLDER", "")  # Prometheus textfile-collector folder (node_exporter --collector.textfile.directory); '' = off. Set by the master runner when its metrics are on
+METRICS_INTERVAL_SECONDS = 15  # How often the .prom file is rewritten during the run
+
+# Profiling
+PROFILE_MODE = ""  # "cpu" (cProfile), "memory" (tracemalloc), "both" or "" = off; --profile[=cpu|memory|both] on the command line overrides
+PROFILE_PATH = os.path.join(SHARED_FOLDER, "db_connections_flows_profile")  # Reports are written as <PROFILE_PATH>.prof, _cpu.txt and _memory.txt
+PROFILE_TOP_N = 30  # Hot frames / allocation sites listed in the reports
+PROFILE_TRACEBACK_FRAMES = 25  # Stack depth kept per allocation in memory mode
+
 # ==============================
 # LIBRARIES
 # ==============================
 
+import cProfile
 import csv
 import json
+import pstats
 import re
 import sys
+import threading
 import time
+import tracemalloc
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import requests
 import xml.etree.ElementTree as ET
 
@@ -59,12 +84,15 @@ class ScriptTimer:
     def __enter__(self):
         self.start = datetime.now(timezone.utc)
         print(f"[INFO] {self.label} start (UTC): {self.start.isoformat()}")
+        _METRICS.start()
         return self
     def __exit__(self, exc_type, exc, tb):
         end = datetime.now(timezone.utc)
         dur = (end - self.start).total_seconds() if self.start else 0.0
         print(f"[INFO] {self.label} end   (UTC): {end.isoformat()}")
         print(f"[INFO] Duration: {dur:.2f} seconds")
+        _METRICS.finish(exc_type is None)
+        _TRACER.finish()
 
 # ==============================
 # LOGGING
@@ -77,6 +105,510 @@ def debug_print(msg: str):
     if DEBUG_MODE:
         print(f"[DEBUG] {msg}")       
 
+# ==============================
+# TRACING
+# ==============================
+
+_ID_SEGMENT = re.compile(r'^(?:[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}|\d+)$')
+
+def endpoint_template(url: str) -> str:
+    """URL path with the API version and ids replaced, e.g. /api/{version}/sites/{id}/workbooks"""
+    parts = re.sub(r'^[A-Za-z]+://[^/]+', '', url).split('?', 1)[0].split('/')
+    for i, seg in enumerate(parts):
+        if i > 0 and parts[i - 1] == 'api' and re.match(r'^\d+(\.\d+)*$', seg):
+            parts[i] = '{version}'
+        elif _ID_SEGMENT.match(seg):
+            parts[i] = '{id}'
+    return '/'.join(parts)
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = int(-(-pct * len(sorted_values) // 100))
+    return sorted_values[min(len(sorted_values), max(1, rank)) - 1]
+
+class RequestTracer:
+    """
+    One event per HTTP call, XML parse and pipeline stage, appended to
+    TRACE_PATH as JSONL when TRACE_FILE_ENABLED. finish() (called by
+    ScriptTimer) adds a summary line and prints latency percentiles and the
+    slowest endpoints.
+    """
+    def __init__(self):
+        self.enabled = TRACE_ENABLED
+        self.endpoints = {}
+        self.stages = {}
+        self.path = None
+        self._file = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _write(self, event: dict):
+        if not TRACE_FILE_ENABLED:
+            return
+        if self._file is None:
+            if self.path is not None:
+                return  # opening failed earlier; keep the in-memory summary only
+            self.path = TRACE_PATH
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self._file = open(self.path, 'w', encoding='utf-8')
+            except OSError as e:
+                print(f"[WARN] Trace file disabled: {e}")
+                return
+        self._file.write(json.dumps(event) + '\n')
+
+    def _endpoint(self, key):
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = {'latencies': [], 'bytes': 0, 'retries': 0, 'errors': 0, 'parse_seconds': 0.0}
+            self.endpoints[key] = stats
+        return stats
+
+    def http(self, method: str, url: str, response, latency: float, retries: int, wait: float, stream: bool = False):
+        if not self.enabled:
+            return
+        status = response.status_code if response is not None else None
+        size = None
+        if response is not None:
+            length = response.headers.get('Content-Length', '')
+            if length.isdigit():
+                size = int(length)
+            elif not stream:
+                size = len(response.content)
+        key = (method, endpoint_template(url))
+        self._local.endpoint = key
+        event = {'type': 'http', 'ts': now_utc_iso(), 'method': method, 'endpoint': key[1], 'status': status,
+                 'bytes': size, 'latencyMs': round(latency * 1000, 3), 'retries': retries, 'waitMs': round(wait * 1000, 3)}
+        with self._lock:
+            stats = self._endpoint(key)
+            stats['latencies'].append(latency)
+            stats['bytes'] += size or 0
+            stats['retries'] += retries
+            if status is None or status >= 400:
+                stats['errors'] += 1
+            self._write(event)
+
+    def parse(self, seconds: float, size: int):
+        if not self.enabled:
+            return
+        key = getattr(self._local, 'endpoint', None) or ('', '')
+        with self._lock:
+            self._endpoint(key)['parse_seconds'] += seconds
+            self._write({'type': 'parse', 'ts': now_utc_iso(), 'method': key[0], 'endpoint': key[1],
+                         'bytes': size, 'parseMs': round(seconds * 1000, 3)})
+
+    def stage(self, name: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            calls, total = self.stages.get(name, (0, 0.0))
+            self.stages[name] = (calls + 1, total + seconds)
+            self._write({'type': 'stage', 'ts': now_utc_iso(), 'stage': name, 'seconds': round(seconds, 6)})
+
+    def finish(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            latencies = sorted(l for s in self.endpoints.values() for l in s['latencies'])
+            endpoints = []
+            for (method, endpoint), s in self.endpoints.items():
+                lat = sorted(s['latencies'])
+                endpoints.append({
+                    'method': method, 'endpoint': endpoint, 'requests': len(lat),
+                    'totalSeconds': round(sum(lat), 6), 'p50Ms': round(percentile(lat, 50) * 1000, 3),
+                    'p95Ms': round(percentile(lat, 95) * 1000, 3), 'p99Ms': round(percentile(lat, 99) * 1000, 3),
+                    'bytes': s['bytes'], 'retries': s['retries'], 'errors': s['errors'],
+                    'parseSeconds': round(s['parse_seconds'], 6)
+                })
+            endpoints.sort(key=lambda e: e['totalSeconds'], reverse=True)
+            summary = {
+                'type': 'summary', 'ts': now_utc_iso(), 'requests': len(latencies),
+                'bytes': sum(e['bytes'] for e in endpoints), 'retries': sum(e['retries'] for e in endpoints),
+                'errors': sum(e['errors'] for e in endpoints), 'p50Ms': round(percentile(latencies, 50) * 1000, 3),
+                'p95Ms': round(percentile(latencies, 95) * 1000, 3), 'p99Ms': round(percentile(latencies, 99) * 1000, 3),
+                'stages': {name: {'calls': c, 'seconds': round(t, 6)} for name, (c, t) in self.stages.items()},
+                'endpoints': endpoints
+            }
+            self._write(summary)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        print(f"[INFO] Requests: {summary['requests']}, {summary['bytes'] / 1048576:.2f} MB, "
+              f"{summary['retries']} retries, {summary['errors']} errors; latency p50 {summary['p50Ms']:.0f} ms, "
+              f"p95 {summary['p95Ms']:.0f} ms, p99 {summary['p99Ms']:.0f} ms")
+        for e in endpoints[:5]:
+            print(f"[INFO]   {e['method']} {e['endpoint']}: {e['requests']} calls, {e['totalSeconds']:.2f}s total, "
+                  f"p95 {e['p95Ms']:.0f} ms, {e['bytes'] / 1048576:.2f} MB")
+        if self.stages:
+            print("[INFO] Stages: " + ", ".join(f"{n} {t:.2f}s" for n, (c, t) in self.stages.items()))
+        if self.path is not None and os.path.exists(self.path):
+            print(f"[INFO] Trace written to {self.path}")
+
+_TRACER = RequestTracer()
+
+_STAGE_DEPTH = threading.local()
+
+def trace_stage(name: str):
+    """Decorator recording the wall time of each call as a pipeline stage"""
+    def decorator(func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            depth = getattr(_STAGE_DEPTH, 'value', 0)
+            _STAGE_DEPTH.value = depth + 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _STAGE_DEPTH.value = depth
+                _TRACER.stage(name, time.perf_counter() - start)
+                if _PROFILER is not None and depth == 0:
+                    _PROFILER.checkpoint(name)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+    return decorator
+
+def parse_xml(text):
+    """ET.fromstring, timed against the last request made on this thread"""
+    start = time.perf_counter()
+    root = ET.fromstring(text)
+    _TRACER.parse(time.perf_counter() - start, len(text))
+    return root
+
+# ==============================
+# METRICS
+# ==============================
+
+METRICS_EXTRACTOR = re.sub(r'^GET ', '', os.path.splitext(os.path.basename(__file__))[0])
+
+def _label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class RunMetrics:
+    """
+    Prometheus counters, gauges and a request-latency histogram for this run,
+    written atomically to METRICS_FOLDER/tableau_<extractor>.prom (node_exporter
+    textfile collector format) every METRICS_INTERVAL_SECONDS and at exit.
+    Does nothing while METRICS_FOLDER is empty.
+    """
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self):
+        self.requests = {}
+        self.latency = {}
+        self.errors = 0
+        self.rows = 0
+        self.started = None
+        self.finished = None
+        self.success = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def observe_request(self, method: str, url: str, status, seconds: float):
+        if not METRICS_FOLDER:
+            return
+        endpoint = endpoint_template(url)
+        with self._lock:
+            key = (method, endpoint, str(status) if status is not None else 'error')
+            self.requests[key] = self.requests.get(key, 0) + 1
+            if status is None or status >= 400:
+                self.errors += 1
+            hist = self.latency.get(endpoint)
+            if hist is None:
+                hist = self.latency[endpoint] = [0] * len(self.BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    hist[i] += 1
+            hist[-2] += seconds
+            hist[-1] += 1
+
+    def observe_rows(self, count: int):
+        if METRICS_FOLDER:
+            with self._lock:
+                self.rows += count
+
+    def start(self):
+        if not METRICS_FOLDER:
+            return
+        self.started = time.time()
+        self._thread = threading.Thread(target=self._loop, name='metrics-writer', daemon=True)
+        self._thread.start()
+
+    def finish(self, success: bool):
+        if not METRICS_FOLDER or self.started is None:
+            return
+        self.finished = time.time()
+        self.success = success
+        self._stop.set()
+        self.write()
+
+    def _loop(self):
+        while not self._stop.wait(METRICS_INTERVAL_SECONDS):
+            self.write()
+
+    def render(self) -> str:
+        ex = f'extractor="{_label(METRICS_EXTRACTOR)}"'
+        limiter = globals().get('_RATE_LIMITER')
+        now = self.finished or time.time()
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            family('tableau_extractor_requests_total', 'counter', 'HTTP requests sent, by endpoint template and final status.')
+            for (method, endpoint, status), count in sorted(self.requests.items()):
+                lines.append(f'tableau_extractor_requests_total{{{ex},method="{method}",endpoint="{_label(endpoint)}",status="{status}"}} {count}')
+            family('tableau_extractor_request_errors_total', 'counter', 'Requests that failed or returned HTTP 4xx/5xx.')
+            lines.append(f'tableau_extractor_request_errors_total{{{ex}}} {self.errors}')
+            family('tableau_extractor_request_duration_seconds', 'histogram', 'Request latency including retries, excluding rate-limit waits.')
+            for endpoint, hist in sorted(self.latency.items()):
+                base = f'{ex},endpoint="{_label(endpoint)}"'
+                for bound, count in zip(self.BUCKETS, hist):
+                    lines.append(f'tableau_extractor_request_duration_seconds_bucket{{{base},le="{bound}"}} {count}')
+                lines.append(f'tableau_extractor_request_duration_seconds_bucket{{{base},le="+Inf"}} {hist[-1]}')
+                lines.append(f'tableau_extractor_request_duration_seconds_sum{{{base}}} {hist[-2]:.6f}')
+                lines.append(f'tableau_extractor_request_duration_seconds_count{{{base}}} {hist[-1]}')
+            family('tableau_extractor_rows_written_total', 'counter', 'Rows passed to write_csv.')
+            lines.append(f'tableau_extractor_rows_written_total{{{ex}}} {self.rows}')
+        if limiter is not None:
+            family('tableau_extractor_in_flight_requests', 'gauge', 'Requests currently in flight.')
+            lines.append(f'tableau_extractor_in_flight_requests{{{ex}}} {limiter.in_flight}')
+            family('tableau_extractor_concurrency_limit', 'gauge', 'Current adaptive concurrency window.')
+            lines.append(f'tableau_extractor_concurrency_limit{{{ex}}} {limiter.limit}')
+            family('tableau_extractor_rate_limit_wait_seconds_total', 'counter', 'Time callers spent waiting on the rate limiter.')
+            lines.append(f'tableau_extractor_rate_limit_wait_seconds_total{{{ex}}} {limiter.wait_seconds:.6f}')
+            family('tableau_extractor_throttled_total', 'counter', 'HTTP 429/503 responses received.')
+            lines.append(f'tableau_extractor_throttled_total{{{ex}}} {limiter.throttled_count}')
+        family('tableau_extractor_start_time_seconds', 'gauge', 'Unix time the run started.')
+        lines.append(f'tableau_extractor_start_time_seconds{{{ex}}} {self.started:.3f}')
+        family('tableau_extractor_duration_seconds', 'gauge', 'Seconds the run has taken so far, or in total once finished.')
+        lines.append(f'tableau_extractor_duration_seconds{{{ex}}} {now - self.started:.3f}')
+        family('tableau_extractor_running', 'gauge', '1 while the run is in progress.')
+        lines.append(f'tableau_extractor_running{{{ex}}} {0 if self.finished else 1}')
+        if self.success is not None:
+            family('tableau_extractor_success', 'gauge', '1 if the last run finished without an error.')
+            lines.append(f'tableau_extractor_success{{{ex}}} {1 if self.success else 0}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self):
+        path = os.path.join(METRICS_FOLDER, f"tableau_{METRICS_EXTRACTOR}.prom")
+        try:
+            os.makedirs(METRICS_FOLDER, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(self.render())
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[WARN] Could not write metrics to {path}: {e}")
+
+_METRICS = RunMetrics()
+
+# ==============================
+# PROFILING
+# ==============================
+
+# Functions that start a pipeline stage; other frames are tagged with the nearest one above them
+PROFILE_STAGE_FUNCTIONS = {
+    'api_request': 'network',
+    'paginate_xml': 'paginate',
+    'parse_xml': 'parse',
+    'extract_connection_attributes': 'flatten',
+    'write_csv': 'write'
+}
+PROFILE_STAGES = ['network', 'paginate', 'parse', 'flatten', 'write']
+
+def profile_stage_of(func_name: str):
+    if func_name.startswith('flatten_'):
+        return 'flatten'
+    return PROFILE_STAGE_FUNCTIONS.get(func_name)
+
+def profile_mode() -> str:
+    """'cpu', 'memory', 'both' or '' from --profile[=mode] on the command line, else PROFILE_MODE"""
+    for arg in sys.argv[1:]:
+        if arg == '--profile':
+            return 'cpu'
+        if arg.startswith('--profile='):
+            return arg.split('=', 1)[1]
+    return PROFILE_MODE
+
+class Profiler:
+    """
+    cProfile and/or tracemalloc around main(). Reports go to PROFILE_PATH +
+    '.prof' / '_cpu.txt' / '_memory.txt', with time and allocations split
+    by pipeline stage.
+    """
+    def __init__(self, mode: str):
+        self.cpu = mode in ('cpu', 'both')
+        self.memory = mode in ('memory', 'both')
+        self.profiles = []
+        self.snapshot = None
+        self.snapshot_label = None
+        self.snapshot_size = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _profile_thread(self, frame, event, arg):
+        # Before 3.12 cProfile only sees the thread that enabled it, so every
+        # worker thread gets its own profiler; later versions refuse a second one
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            self.profiles.append(profile)
+        except ValueError:
+            sys.setprofile(None)
+
+    def start(self):
+        self._thread = threading.current_thread()
+        if self.memory:
+            tracemalloc.start(PROFILE_TRACEBACK_FRAMES)
+        if self.cpu:
+            profile = cProfile.Profile()
+            self.profiles.append(profile)
+            threading.setprofile(self._profile_thread)
+            profile.enable()
+
+    def checkpoint(self, label: str):
+        """
+        Keep the allocation snapshot taken when traced memory is highest. Only
+        stages on the thread that started profiling take snapshots; work on
+        pool threads is still live at the end of the stage that started it.
+        """
+        if not self.memory or threading.current_thread() is not self._thread:
+            return
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                return
+            current = tracemalloc.get_traced_memory()[0]
+            if self.snapshot is None or current > self.snapshot_size:
+                self.snapshot = tracemalloc.take_snapshot()
+                self.snapshot_size = current
+                self.snapshot_label = label
+
+    def stop(self):
+        # Every profiler off before either report is built, so neither shows up in the CPU profile
+        if self.cpu:
+            threading.setprofile(None)
+            for profile in self.profiles:
+                profile.disable()
+        # Memory next, so building the CPU report does not show up in the snapshot
+        if self.memory:
+            self.checkpoint('end of run')
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self.write_memory_report(peak)
+        if self.cpu:
+            self.write_cpu_report()
+
+    def write_cpu_report(self):
+        os.makedirs(os.path.dirname(PROFILE_PATH) or '.', exist_ok=True)
+        stats = pstats.Stats(*self.profiles)
+        stats.dump_stats(PROFILE_PATH + '.prof')
+        entries = stats.stats  # (file, line, func) -> (cc, ncalls, tottime, cumtime, callers)
+
+        # Inclusive time per stage, and exclusive time with nested stages taken out
+        inclusive = dict.fromkeys(PROFILE_STAGES, 0.0)
+        exclusive = dict.fromkeys(PROFILE_STAGES, 0.0)
+        for key, (cc, nc, tt, ct, callers) in entries.items():
+            stage = profile_stage_of(key[2])
+            if stage is None:
+                continue
+            inclusive[stage] += ct
+            exclusive[stage] += ct
+            for caller, caller_stats in callers.items():
+                caller_stage = profile_stage_of(caller[2])
+                if caller_stage is not None and caller_stage != stage:
+                    exclusive[caller_stage] -= caller_stats[3]
+
+        memo = {}
+        def stage_of(key, depth=0):
+            if key in memo:
+                return memo[key]
+            stage = profile_stage_of(key[2])
+            if stage is None and depth < 50 and key in entries:
+                memo[key] = None  # guards recursion
+                for caller in entries[key][4]:
+                    stage = stage_of(caller, depth + 1)
+                    if stage:
+                        break
+            memo[key] = stage
+            return stage
+
+        lines = [f"CPU profile for {os.path.basename(__file__)} ({len(self.profiles)} profiled thread(s))",
+                 f"Full profile: {PROFILE_PATH}.prof (python -m pstats, snakeviz)",
+                 "Seconds are summed over all profiled threads.", "",
+                 f"{'stage':<10}{'inclusive s':>14}{'exclusive s':>14}"]
+        for stage in PROFILE_STAGES:
+            lines.append(f"{stage:<10}{inclusive[stage]:>14.3f}{max(0.0, exclusive[stage]):>14.3f}")
+        lines += ["", "Hot frames by own time (stage = nearest pipeline stage on the call path):",
+                  f"{'tottime':>10}{'cumtime':>10}{'ncalls':>10}  {'stage':<10}function"]
+        top = sorted(entries.items(), key=lambda item: item[1][2], reverse=True)[:PROFILE_TOP_N]
+        for key, (cc, nc, tt, ct, callers) in top:
+            where = f"{os.path.basename(key[0])}:{key[1]}({key[2]})" if key[0] != '~' else key[2]
+            lines.append(f"{tt:>10.3f}{ct:>10.3f}{nc:>10}  {stage_of(key) or '-':<10}{where}")
+        with open(PROFILE_PATH + '_cpu.txt', 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        print_progress(f"CPU profile written to {PROFILE_PATH}.prof and {PROFILE_PATH}_cpu.txt")
+
+    def write_memory_report(self, peak: int):
+        os.makedirs(os.path.dirname(PROFILE_PATH) or '.', exist_ok=True)
+        # Map this script's functions to line ranges so tracebacks can be tagged by stage
+        ranges = []
+        for name, obj in list(globals().items()):
+            code = getattr(getattr(obj, '__wrapped__', obj), '__code__', None)
+            stage = profile_stage_of(name)
+            if code is not None and stage is not None:
+                line_numbers = [line for _, _, line in code.co_lines() if line is not None]
+                ranges.append((code.co_filename, min(line_numbers), max(line_numbers), stage))
+
+        def stage_of(traceback):
+            for frame in reversed(traceback):  # innermost frame first
+                for filename, first, last, stage in ranges:
+                    if frame.filename == filename and first <= frame.lineno <= last:
+                        return stage
+            return None
+
+        by_stage = dict.fromkeys(PROFILE_STAGES + ['other'], 0)
+        snapshot = self.snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        for stat in snapshot.statistics('traceback'):
+            by_stage[stage_of(stat.traceback) or 'other'] += stat.size
+
+        lines = [f"Memory profile for {os.path.basename(__file__)}",
+                 f"Peak traced memory: {peak / 1048576:.1f} MB",
+                 f"Snapshot taken at: {self.snapshot_label} ({self.snapshot_size / 1048576:.1f} MB live)", "",
+                 "Live allocations by stage that allocated them:"]
+        for stage, size in by_stage.items():
+            lines.append(f"  {stage:<10}{size / 1048576:>10.2f} MB")
+        lines += ["", f"Top {PROFILE_TOP_N} allocation sites:"]
+        for stat in snapshot.statistics('lineno')[:PROFILE_TOP_N]:
+            frame = stat.traceback[0]
+            lines.append(f"  {stat.size / 1048576:>9.2f} MB {stat.count:>9} blocks  "
+                         f"{os.path.basename(frame.filename)}:{frame.lineno}")
+        with open(PROFILE_PATH + '_memory.txt', 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        print_progress(f"Memory profile written to {PROFILE_PATH}_memory.txt")
+
+_PROFILER = None
+
+def run_profiled(func):
+    """Call func (main) under the profiler when profiling is switched on"""
+    global _PROFILER
+    mode = profile_mode()
+    if not mode:
+        return func()
+    if mode not in ('cpu', 'memory', 'both'):
+        raise ValueError(f"Unknown profile mode '{mode}' (use cpu, memory or both)")
+    _PROFILER = Profiler(mode)
+    _PROFILER.start()
+    try:
+        return func()
+    finally:
+        _PROFILER.stop()
+
 # ==============================
 # FLATTEN HELPERS
 # ==============================    
@@ -136,7 +668,9 @@ def _norm(s: str) -> str:
 # WRITE CSV
 # ==============================
 
+@trace_stage("write_csv")
 def write_csv(rows, path, desired_headers=None):
+    _METRICS.observe_rows(len(rows) if rows else 0)
     rows = rows or []
     published_at = now_utc_iso()
     for r in rows:
@@ -202,15 +736,126 @@ def write_csv(rows, path, desired_headers=None):
             w.writerow(row_out)
     print_progress(f"Wrote {len(rows)} rows")
 
+# ==============================
+# RATE LIMITING
+# ==============================
+
+class AdaptiveRateLimiter:
+    """
+    Process-wide token bucket plus an AIMD concurrency window.
+    A 429/503 halves the rate and window and pauses every caller until
+    Retry-After has passed; each healthy window of responses grows them back.
+    """
+    def __init__(self, max_rate: float, max_concurrency: int):
+        self.max_rate = float(max_rate)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.rate = self.max_rate
+        self.limit = self.max_concurrency
+        self.tokens = max(1.0, self.rate)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.wait_seconds = 0.0
+        self.throttled_count = 0
+        self._healthy = 0
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float):
+        self.tokens = min(max(1.0, self.rate), self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    self._cond.wait(self.blocked_until - now)
+                elif self.in_flight >= self.limit:
+                    self._cond.wait()
+                elif self.tokens < 1.0:
+                    self._cond.wait((1.0 - self.tokens) / self.rate)
+                else:
+                    self.tokens -= 1.0
+                    self.in_flight += 1
+                    break
+            self.wait_seconds += time.monotonic() - start
+
+    def release(self, throttled: bool = False, retry_after: float = None, healthy: bool = True):
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled_count += 1
+                self._healthy = 0
+                self.limit = max(1, self.limit // 2)
+                self.rate = max(0.5, self.rate / 2)
+                pause = retry_after if retry_after is not None else 1.0
+                self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+            elif healthy:
+                self._healthy += 1
+                if self._healthy >= self.limit:
+                    self._healthy = 0
+                    self.limit = min(self.max_concurrency, self.limit + 1)
+                    self.rate = min(self.max_rate, self.rate + max(0.5, self.max_rate / 10))
+            self._cond.notify_all()
+
+_RATE_LIMITER = AdaptiveRateLimiter(RATE_LIMIT_REQUESTS_PER_SECOND, RATE_LIMIT_MAX_CONCURRENCY)
+
+def parse_retry_after(value):
+    """Retry-After header as seconds (delta-seconds or HTTP-date); None if absent."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def api_request(method: str, url: str, **kwargs):
+    """Send a request through the shared rate limiter, retrying 429/503 after Retry-After."""
+    latency = wait = 0.0
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        queued = time.perf_counter()
+        _RATE_LIMITER.acquire()
+        sent = time.perf_counter()
+        wait += sent - queued
+        throttled, retry_after, healthy = False, None, False
+        try:
+            r = requests.request(method, url, **kwargs)
+            throttled = r.status_code in (429, 503)
+            healthy = r.status_code < 500
+            if throttled:
+                retry_after = parse_retry_after(r.headers.get('Retry-After'))
+                if retry_after is None:
+                    retry_after = min(60.0, 2.0 ** attempt)
+        except Exception:
+            _TRACER.http(method, url, None, latency + time.perf_counter() - sent, attempt, wait)
+            _METRICS.observe_request(method, url, None, latency + time.perf_counter() - sent)
+            raise
+        finally:
+            latency += time.perf_counter() - sent
+            _RATE_LIMITER.release(throttled, retry_after, healthy)
+        if not throttled or attempt == RATE_LIMIT_MAX_RETRIES:
+            _TRACER.http(method, url, r, latency, attempt, wait, kwargs.get('stream', False))
+            _METRICS.observe_request(method, url, r.status_code, latency)
+            return r
+        r.close()
+        print(f"[WARN] HTTP {r.status_code} (rate limited) - waiting {retry_after:.1f}s, retry {attempt + 1}/{RATE_LIMIT_MAX_RETRIES}")
+    return r
+
 # ==============================
 # AUTH & API VERSION & SIGNOUT
 # ==============================
 
 def get_latest_api_version() -> str:
     url = f"{SERVER_URL}/api/3.21/serverinfo"
-    r = requests.get(url)
+    r = api_request("GET", url)
     r.raise_for_status()
-    root = ET.fromstring(r.text)
+    root = parse_xml(r.text)
     api = root.find('.//t:restApiVersion', {'t': 'http://tableau.com/api'}).text
     print_progress(f"Using API version: {api}")
     return api
@@ -225,9 +870,9 @@ def sign_in(api_version: str):
     </tsRequest>
     '''.strip()
     body = body.replace("{TOKEN_NAME}", TOKEN_NAME).replace("{TOKEN_SECRET}", TOKEN_SECRET).replace("{SITE_CONTENT_URL}", SITE_CONTENT_URL)
-    r = requests.post(signin_url, data=body, headers={'Content-Type': 'application/xml'})
+    r = api_request("POST", signin_url, data=body, headers={'Content-Type': 'application/xml'})
     r.raise_for_status()
-    root = ET.fromstring(r.text)
+    root = parse_xml(r.text)
     token = root.find('.//t:credentials', {'t': 'http://tableau.com/api'}).attrib['token']
     site_id = root.find('.//t:site', {'t': 'http://tableau.com/api'}).attrib['id']
     print_progress(f"Authenticated. Site ID: {site_id}")
@@ -236,7 +881,7 @@ def sign_in(api_version: str):
 def sign_out(api_version: str, token: str):
     try:
         url = f"{SERVER_URL}/api/{api_version}/auth/signout"
-        requests.post(url, headers={'X-Tableau-Auth': token}).raise_for_status()
+        api_request("POST", url, headers={'X-Tableau-Auth': token}).raise_for_status()
         print_progress("Signed out.")
     except Exception as e:
         print(f"[WARN] Sign out error: {e}")
@@ -251,9 +896,9 @@ def paginate_xml(api_version: str, path: str, token: str, page_size: int = 1000)
     headers = {'X-Tableau-Auth': token}
     while True:
         url = f"{SERVER_URL}/api/{api_version}{path}?pageSize={page_size}&pageNumber={page}"
-        r = requests.get(url, headers=headers)
+        r = api_request("GET", url, headers=headers)
         r.raise_for_status()
-        root = ET.fromstring(r.text)
+        root = parse_xml(r.text)
         yield root
         p = root.find('.//t:pagination', ns)
         if p is not None:
@@ -293,12 +938,12 @@ def fetch_flow_details(api_version: str, site_id: str, token: str, flow_id: str)
     ns = {'t': 'http://tableau.com/api'}
     try:
         url = f"{SERVER_URL}/api/{api_version}/sites/{site_id}/flows/{flow_id}"
-        r = requests.get(url, headers=headers)
+        r = api_request("GET", url, headers=headers)
         if r.status_code == 404:
             debug_print(f"Flow {flow_id} not found (404)")
             return {}
         r.raise_for_status()
-        root = ET.fromstring(r.text)
+        root = parse_xml(r.text)
         flow_elem = root.find('.//t:flow', ns)
         if flow_elem is not None:
             details = {f"flow.{k}": v for k, v in flow_elem.attrib.items()}
@@ -307,6 +952,7 @@ def fetch_flow_details(api_version: str, site_id: str, token: str, flow_id: str)
         debug_print(f"Error fetching flow details for {flow_id}: {e}")
     return {}
 
+@trace_stage("fetch_rows")
 def fetch_rows(api_version: str, site_id: str, token: str):
     ns = {'t': 'http://tableau.com/api'}
     headers = {'X-Tableau-Auth': token}
@@ -336,7 +982,7 @@ def fetch_rows(api_version: str, site_id: str, token: str):
         # Get connections for this flow
         url = f"{SERVER_URL}/api/{api_version}/sites/{site_id}/flows/{flow_id}/connections"
         try:
-            r = requests.get(url, headers=headers)
+            r = api_request("GET", url, headers=headers)
             if r.status_code == 404:
                 empty_connections += 1
                 row = {
@@ -358,7 +1004,7 @@ def fetch_rows(api_version: str, site_id: str, token: str):
             debug_print(f"Error fetching connections for flow {flow_id}: {e}")
             continue
 
-        root = ET.fromstring(r.text)
+        root = parse_xml(r.text)
         conns = root.findall('.//t:connection', ns)
 
         if not conns:
@@ -423,7 +1069,7 @@ def main():
 
 if __name__ == "__main__":
     try:
-        main()
+        run_profiled(main)
     except Exception as e:
         print(f"[ERROR] {e}")
         sys.exit(1)
@@ -1,33 +1,162 @@
 import os
+import re
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # Full path to the folder containing the Python scripts
 SCRIPT_DIR = 'Your-python-repository' # Replace with where your Tableau REST python scripts are located
 
-# Get the name of this script (so we can skip it)
-CURRENT_SCRIPT = os.path.basename(__file__)
+# Runner scripts (this one and "Tableau REST Multi-Site Data Pull.py") are skipped
+RUNNER_PREFIX = "Tableau REST "
+
+# Metrics (optional). Either setting turns metrics on for every script run below.
+METRICS_FOLDER = ""  # Prometheus textfile-collector folder; each script writes tableau_<name>.prom here
+METRICS_PORT = 0     # e.g. 9464 to serve all scripts' metrics at http://<host>:9464/metrics during the run; 0 = off
+DEFAULT_METRICS_FOLDER = os.path.join(tempfile.gettempdir(), "tableau_metadata_insights", "metrics")  # Used when only METRICS_PORT is set
+
+# Profiling: "--profile" or "--profile=cpu|memory|both" on this runner is passed on to every script
+PROFILE_ARGS = [a for a in sys.argv[1:] if a == "--profile" or a.startswith("--profile=")]
+
+# Run state for this runner's own metrics
+_run = {"started": None, "total": 0, "completed": 0, "current": None, "durations": {}, "exit_codes": {}}
+_run_lock = threading.Lock()
+
+def render_runner_metrics() -> str:
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    with _run_lock:
+        family("tableau_pull_scripts_total", "gauge", "Scripts scheduled in this master run.")
+        lines.append(f"tableau_pull_scripts_total {_run['total']}")
+        family("tableau_pull_scripts_completed", "gauge", "Scripts finished so far (any exit code).")
+        lines.append(f"tableau_pull_scripts_completed {_run['completed']}")
+        family("tableau_pull_running", "gauge", "1 while the master run is in progress.")
+        lines.append(f"tableau_pull_running {0 if _run['current'] is None else 1}")
+        if _run["current"] is not None:
+            family("tableau_pull_current_script", "gauge", "Script currently running.")
+            lines.append(f'tableau_pull_current_script{{script="{_run["current"]}"}} 1')
+        family("tableau_pull_script_duration_seconds", "gauge", "Wall time of each finished script.")
+        for script, seconds in sorted(_run["durations"].items()):
+            lines.append(f'tableau_pull_script_duration_seconds{{script="{script}"}} {seconds:.3f}')
+        family("tableau_pull_script_exit_code", "gauge", "Exit code of each finished script.")
+        for script, code in sorted(_run["exit_codes"].items()):
+            lines.append(f'tableau_pull_script_exit_code{{script="{script}"}} {code}')
+    return "\n".join(lines) + "\n"
+
+def write_runner_metrics(folder: str):
+    path = os.path.join(folder, "tableau_master_pull.prom")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_runner_metrics())
+    os.replace(tmp, path)
+
+def merged_metrics(folder: str) -> str:
+    """
+    Every *.prom file in the folder as one exposition. Each metric family's
+    HELP/TYPE lines appear once, followed by the samples from every file.
+    """
+    families = {}
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith(".prom"):
+            continue
+        try:
+            with open(os.path.join(folder, name), encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            continue
+        current = None
+        for line in text.splitlines():
+            if line.startswith("# HELP ") or line.startswith("# TYPE "):
+                parts = line.split(" ", 3)
+                current = parts[2]
+                entry = families.setdefault(current, {"HELP": None, "TYPE": None, "samples": []})
+                if entry[parts[1]] is None:
+                    entry[parts[1]] = line
+            elif line and not line.startswith("#"):
+                sample = re.match(r"[a-zA-Z_:][a-zA-Z0-9_:]*", line).group(0)
+                family = current if current and sample.startswith(current) else sample
+                families.setdefault(family, {"HELP": None, "TYPE": None, "samples": []})["samples"].append(line)
+    out = []
+    for entry in families.values():
+        out.extend(line for line in (entry["HELP"], entry["TYPE"]) if line)
+        out.extend(entry["samples"])
+    return "\n".join(out) + "\n"
+
+def start_metrics_server(folder: str, port: int):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            write_runner_metrics(folder)
+            body = merged_metrics(folder).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📈 Metrics at http://localhost:{port}/metrics")
+    return server
 
 def main():
     # List all Python files in the folder
     python_scripts = [
         f for f in os.listdir(SCRIPT_DIR)
-        if f.endswith(".py") and f != CURRENT_SCRIPT
+        if f.endswith(".py") and not f.startswith(RUNNER_PREFIX)
     ]
 
     # Sort scripts alphabetically (optional, remove if you want random or custom order)
     python_scripts.sort()
 
-    for script in python_scripts:
-        script_path = os.path.join(SCRIPT_DIR, script)
-        print(f"\n➡️ Running: {script}")
-        result = subprocess.run(["python", script_path])
-        
-        if result.returncode != 0:
-            print(f"❌ Script {script} failed with exit code {result.returncode}")
-            break  # Optional: stop on failure
-        else:
-            print(f"✅ Completed: {script}")
+    # Child scripts pick the metrics folder up from the environment
+    env = dict(os.environ)
+    metrics_folder = METRICS_FOLDER or (DEFAULT_METRICS_FOLDER if METRICS_PORT else "")
+    server = None
+    if metrics_folder:
+        os.makedirs(metrics_folder, exist_ok=True)
+        env["TABLEAU_METRICS_FOLDER"] = metrics_folder
+        _run["started"] = time.time()
+        _run["total"] = len(python_scripts)
+        if METRICS_PORT:
+            server = start_metrics_server(metrics_folder, METRICS_PORT)
+
+    try:
+        for script in python_scripts:
+            script_path = os.path.join(SCRIPT_DIR, script)
+            print(f"\n➡️ Running: {script}")
+            with _run_lock:
+                _run["current"] = script
+            started = time.time()
+            result = subprocess.run(["python", script_path] + PROFILE_ARGS, env=env)
+            with _run_lock:
+                _run["durations"][script] = time.time() - started
+                _run["exit_codes"][script] = result.returncode
+                _run["completed"] += 1
+                _run["current"] = None
+            if metrics_folder:
+                write_runner_metrics(metrics_folder)
+
+            if result.returncode != 0:
+                print(f"❌ Script {script} failed with exit code {result.returncode}")
+                break  # Optional: stop on failure
+            else:
+                print(f"✅ Completed: {script}")
+    finally:
+        if server is not None:
+            server.shutdown()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,233 @@
+# ==============================
+# USER VARIABLES (EDIT HERE)
+# ==============================
+
+import os
+
+TOKEN_NAME = os.environ.get("TOKEN_NAME")             # PAT of a Server/Site Admin that can see every site
+TOKEN_SECRET = os.environ.get("TOKEN_SECRET")         # Your PAT secret
+SERVER_URL = 'https://YOUR_SERVER_INSTANCE.online.tableau.com' # Your Tableau server instance; overrides SERVER_URL in every extractor
+SITE_CONTENT_URL = ''  # Site to sign in to first ('' = Default site)
+
+# Full path to the folder containing the Python scripts
+SCRIPT_DIR = 'Your-python-repository' # Replace with where your Tableau REST python scripts are located
+
+# Output
+SHARED_FOLDER = "C:/Path/To/Your/Shared/Folder"
+SITE_PARTITION_FOLDER = os.path.join(SHARED_FOLDER, "sites")  # Each site's CSVs go to SITE_PARTITION_FOLDER/<contentUrl>/
+OUTPUT_MODE = "partitioned"  # "partitioned": per-site folders only | "combined": also merge every site into one CSV per extractor in SHARED_FOLDER
+
+# What to run
+SELECTED_EXTRACTORS = []  # e.g. ["GET users.py", "GET groups.py"]; empty = every "GET *.py" extractor except GET sites.py
+SITE_FILTER = []          # contentUrls to include ('' = Default site); empty = every site returned by GET sites.py
+MAX_PARALLEL_EXTRACTORS = 4  # Extractors run at the same time for one site
+
+# Rate limiting (one limiter shared by every extractor in this process)
+RATE_LIMIT_REQUESTS_PER_SECOND = 20
+RATE_LIMIT_MAX_CONCURRENCY = 8
+
+# ==============================
+# LIBRARIES
+# ==============================
+
+import csv
+import importlib.util
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import xml.etree.ElementTree as ET
+
+# ==============================
+# LOGGING
+# ==============================
+
+def print_progress(msg: str):
+    print(f"[PROGRESS] {msg}")
+
+# ==============================
+# EXTRACTOR LOADING
+# ==============================
+
+_module_counter = 0
+
+def load_script(script_name: str):
+    """Load a script file (names contain spaces) as a fresh module; __main__ is not run."""
+    global _module_counter
+    _module_counter += 1
+    path = os.path.join(SCRIPT_DIR, script_name)
+    module_name = "extractor_" + re.sub(r"[^A-Za-z0-9]+", "_", script_name) + f"_{_module_counter}"
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def selected_extractors():
+    if SELECTED_EXTRACTORS:
+        return list(SELECTED_EXTRACTORS)
+    return sorted(
+        f for f in os.listdir(SCRIPT_DIR)
+        if f.startswith("GET ") and f.endswith(".py") and f != "GET sites.py"
+    )
+
+def bind_to_site(module, api_version: str, token: str, site_id: str, site_folder: str, limiter):
+    """
+    Point a loaded extractor at an existing session and a per-site output folder.
+    Its own main() then runs unchanged, but without signing in or out.
+    """
+    module.SERVER_URL = SERVER_URL
+    module.get_latest_api_version = lambda: api_version
+    module.sign_in = lambda _api_version: (token, site_id)
+    module.sign_out = lambda _api_version, _token: None
+    if hasattr(module, "_RATE_LIMITER"):
+        module._RATE_LIMITER = limiter
+
+    # Re-root every output path under the site's folder
+    old_folder = getattr(module, "SHARED_FOLDER", None)
+    if old_folder is not None:
+        for name, value in list(vars(module).items()):
+            if name.endswith("_PATH") and isinstance(value, str) and value.startswith(old_folder):
+                setattr(module, name, os.path.join(site_folder, os.path.relpath(value, old_folder)))
+        module.SHARED_FOLDER = site_folder
+
+# ==============================
+# SITE SESSION
+# ==============================
+
+def switch_site(sites_module, api_version: str, token: str, content_url: str):
+    """
+    Move the session to another site. Uses auth/switchSite where the server
+    supports it (Tableau Server); otherwise signs out and back in with the PAT.
+    Returns (token, site_id).
+    """
+    ns = {'t': 'http://tableau.com/api'}
+    url = f"{SERVER_URL}/api/{api_version}/auth/switchSite"
+    body = f'<tsRequest><site contentUrl="{content_url}"/></tsRequest>'
+    r = sites_module.api_request("POST", url, data=body, headers={'X-Tableau-Auth': token, 'Content-Type': 'application/xml'})
+    if r.status_code == 200:
+        root = ET.fromstring(r.text)
+        new_token = root.find('.//t:credentials', ns).attrib['token']
+        site_id = root.find('.//t:site', ns).attrib['id']
+        print_progress(f"Switched to site '{content_url}' ({site_id})")
+        return new_token, site_id
+
+    print_progress(f"switchSite not available (HTTP {r.status_code}); signing in to '{content_url}'")
+    sites_module.sign_out(api_version, token)
+    sites_module.SITE_CONTENT_URL = content_url
+    return sites_module.sign_in(api_version)
+
+# ==============================
+# COMBINED OUTPUT
+# ==============================
+
+def _norm(s: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "", s.lower())
+
+def combine_site_partitions(site_folders: dict):
+    """
+    Merge each CSV across the per-site folders into SHARED_FOLDER.
+    site_folders maps site id -> folder. Rows are streamed, and a Site Id
+    column is added for outputs that do not already carry one.
+    """
+    by_name = {}
+    for site_id, folder in site_folders.items():
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if name.endswith(".csv"):
+                by_name.setdefault(name, []).append((site_id, os.path.join(folder, name)))
+
+    for name, parts in sorted(by_name.items()):
+        headers = []
+        for _, path in parts:
+            with open(path, newline="", encoding="utf-8") as f:
+                for h in next(csv.reader(f), []):
+                    if h not in headers:
+                        headers.append(h)
+        site_col = next((h for h in headers if _norm(h) in ("siteid", "siteluid")), None)
+        if site_col is None:
+            site_col = "Site Id"
+            headers.append(site_col)
+
+        out_path = os.path.join(SHARED_FOLDER, name)
+        row_count = 0
+        with open(out_path + ".tmp", "w", newline="", encoding="utf-8") as out:
+            w = csv.DictWriter(out, fieldnames=headers, extrasaction="ignore")
+            w.writeheader()
+            for site_id, path in parts:
+                with open(path, newline="", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        if not row.get(site_col):
+                            row[site_col] = site_id
+                        w.writerow(row)
+                        row_count += 1
+        os.replace(out_path + ".tmp", out_path)
+        print_progress(f"Combined {len(parts)} site partitions → {out_path} ({row_count} rows)")
+
+# ==============================
+# MAIN
+# ==============================
+
+def run_site(extractors, api_version: str, token: str, site_id: str, site_folder: str, limiter):
+    """Run the extractors for one site in parallel; returns {script: error or None}."""
+    os.makedirs(site_folder, exist_ok=True)
+
+    def run_one(script_name):
+        try:
+            module = load_script(script_name)
+            bind_to_site(module, api_version, token, site_id, site_folder, limiter)
+            module.main()
+            return script_name, None
+        except Exception as e:
+            print(f"[ERROR] {script_name} failed for site {site_id}: {e}")
+            return script_name, e
+
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_EXTRACTORS) as pool:
+        return dict(pool.map(run_one, extractors))
+
+def main():
+    # GET sites.py supplies sign-in, the site list and the rate limiter class
+    sites_module = load_script("GET sites.py")
+    sites_module.SERVER_URL = SERVER_URL
+    sites_module.TOKEN_NAME = TOKEN_NAME
+    sites_module.TOKEN_SECRET = TOKEN_SECRET
+    sites_module.SITE_CONTENT_URL = SITE_CONTENT_URL
+    limiter = sites_module.AdaptiveRateLimiter(RATE_LIMIT_REQUESTS_PER_SECOND, RATE_LIMIT_MAX_CONCURRENCY)
+    sites_module._RATE_LIMITER = limiter
+
+    extractors = selected_extractors()
+    print_progress(f"Extractors: {', '.join(extractors)}")
+
+    api = sites_module.get_latest_api_version()
+    token, site_id = sites_module.sign_in(api)
+    failures = []
+    site_folders = {}
+    try:
+        sites = [sites_module.parse_site(s) for s in sites_module.get_all_sites(api, token)]
+        if SITE_FILTER:
+            sites = [s for s in sites if s.get('contentUrl', '') in SITE_FILTER]
+        print_progress(f"Running {len(extractors)} extractors for {len(sites)} sites")
+
+        for idx, site in enumerate(sites, start=1):
+            content_url = site.get('contentUrl', '')
+            if site.get('id') != site_id:
+                token, site_id = switch_site(sites_module, api, token, content_url)
+            site_folder = os.path.join(SITE_PARTITION_FOLDER, content_url or "default")
+            site_folders[site_id] = site_folder
+            print_progress(f"[{idx}/{len(sites)}] Site '{site.get('name', content_url)}' → {site_folder}")
+
+            results = run_site(extractors, api, token, site_id, site_folder, limiter)
+            failures.extend((content_url, script) for script, error in results.items() if error is not None)
+    finally:
+        sites_module.sign_out(api, token)
+
+    if OUTPUT_MODE == "combined":
+        combine_site_partitions(site_folders)
+
+    if failures:
+        for content_url, script in failures:
+            print(f"❌ {script} failed for site '{content_url}'")
+        sys.exit(1)
+    print_progress("All sites completed")
+
+if __name__ == "__main__":
+    main()
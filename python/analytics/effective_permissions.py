@@ -0,0 +1,796 @@
+# ==============================
+# USER VARIABLES (EDIT HERE)
+# ==============================
+
+import os
+
+# Builds the rows of TABLEAU.TABLEAU_REST.VW_EFFECTIVE_PERMISSIONS
+# (SQL/vw_effective_permissions.sql) locally from the extractor CSVs, so the
+# items x users x capabilities cross join never runs in Snowflake. The output
+# has the view's columns and loads straight into a table of the same shape.
+
+SHARED_FOLDER = "C:/Path/To/Your/Shared/Folder"  # Where the GET scripts write their CSVs
+INPUT_FILES = {
+    'permissions_explicit': "REST_permissions_explicit.csv",
+    'permissions_default': "REST_permissions_default.csv",
+    'group_users': "REST_group_users.csv",
+    'users': "REST_users.csv",
+    'projects': "REST_items_projects.csv",
+    'datasources': "REST_items_datasources.csv",
+    'flows': "REST_items_flows.csv",
+    'virtual_connections': "REST_items_virtualConnections.csv",
+    'workbooks': "REST_items_workbooks.csv"
+}
+OUTPUT_CSV_PATH = os.path.join(SHARED_FOLDER, "LOCAL_effective_permissions.csv")
+
+# Incremental runs diff this run's inputs against the previous run's copy in
+# STATE_FOLDER and write only the changed rows to DELTA_CSV_PATH (an extra
+# Change_Type column: Added, Removed or Changed). Merge it into the loaded table
+# on Item_LUID, User_LUID and Capability_Name. The first run, or a run without
+# a previous copy, writes the full OUTPUT_CSV_PATH instead.
+INCREMENTAL = False  # Set to True (or pass --incremental)
+STATE_FOLDER = os.path.join(SHARED_FOLDER, "effective_permissions_state")
+DELTA_CSV_PATH = os.path.join(SHARED_FOLDER, "LOCAL_effective_permissions_delta.csv")
+
+# The view also returns a 'Deny' / 'No Capabilities Defined' row for every user
+# with no rule on an item, which is most of its rows. They are left out unless
+# this is True; a missing (item, user, capability) row means exactly that.
+INCLUDE_UNDEFINED = False
+
+# With NumPy installed, items are resolved against every licensed user in blocks
+# of this many (item, user) cells; about a dozen masks of this size are live at once
+NUMPY_BLOCK_CELLS = 1_000_000
+
+# ==============================
+# LIBRARIES
+# ==============================
+
+import csv
+import re
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+
+try:
+    import numpy as np  # Optional; batched resolution falls back to pure Python without it
+except ImportError:
+    np = None
+
+# ==============================
+# LOGGING
+# ==============================
+
+def print_progress(message: str):
+    print(f"[PROGRESS] {message}", flush=True)
+
+# ==============================
+# VIEW RULES
+# ==============================
+
+VIEW_COLUMNS = ["Site_LUID", "Item_Type", "Item_LUID", "User_LUID", "Project_LUID",
+                "Capability_Name", "Capability_Mode", "Capability_Source", "Admin_Insights_Published_At"]
+
+ITEM_TYPES = ('datasource', 'workbook', 'virtualconnection', 'flow', 'project')
+
+SITE_ROLE_VALUES = {
+    'Unlicensed': 0, 'Viewer': 1, 'Explorer': 2, 'ExplorerCanPublish': 3, 'Creator': 4,
+    'SiteAdministratorExplorer': 99, 'SiteAdministratorCreator': 99
+}
+SITE_ADMIN_ROLES = {'SiteAdministratorCreator', 'SiteAdministratorExplorer'}
+
+# Minimum site role value per item type and lower-case capability; pairs not listed have none
+MINIMUM_SITE_ROLE = {
+    'project': {'read': 1, 'write': 3},
+    'workbook': {'read': 1, 'filter': 1, 'viewcomments': 1, 'addcomment': 1, 'exportimage': 1, 'exportdata': 1,
+                 'shareview': 2, 'viewunderlyingdata': 2, 'webauthoring': 2, 'runexplaindata': 2, 'exportxml': 2,
+                 'write': 3, 'createrefreshmetrics': 3, 'changehierarchy': 3, 'delete': 3,
+                 'changepermissions': 3, 'extractrefresh': 3},
+    'datasource': {'read': 1, 'connect': 1, 'exportxml': 2, 'write': 3, 'saveas': 3, 'vizqldataapiaccess': 3,
+                   'pulsemetricdefine': 3, 'delete': 3, 'changehierarchy': 3, 'changepermissions': 3,
+                   'extractrefresh': 3},
+    'flow': {'read': 1, 'exportxml': 2, 'execute': 4, 'write': 4, 'webauthoringforflows': 4, 'delete': 3,
+             'changepermissions': 3, 'changehierarchy': 3},
+    'virtualconnection': {'read': 1, 'connect': 4, 'write': 4, 'changehierarchy': 4, 'delete': 3,
+                          'changepermissions': 3}
+}
+
+# Capability_Mode / Capability_Source by source code, in the view's order of precedence
+SOURCES = [
+    (None, None),
+    ('Allow', 'Site Administrator'),
+    ('Deny', 'Outside Scope of Site Role'),
+    ('Allow', 'Project Owner'),
+    ('Allow', 'Content Owner'),
+    ('Deny', 'User Denied'),
+    ('Allow', 'User Allowed'),
+    ('Deny', 'Group Denied'),
+    ('Allow', 'Group Allowed'),
+    ('Deny', 'No Capabilities Defined')
+]
+SITE_ADMIN, OUTSIDE_SCOPE, PROJECT_OWNER, CONTENT_OWNER, USER_DENIED, USER_ALLOWED, \
+    GROUP_DENIED, GROUP_ALLOWED, UNDEFINED = range(1, len(SOURCES))
+
+# ==============================
+# LOAD INPUTS
+# ==============================
+
+# Field -> accepted column names. The extractor CSV header comes first, then the
+# Snowflake column name, so tables exported back out of Snowflake load as well.
+INPUT_COLUMNS = {
+    'permissions_explicit': {
+        'content_type': ["Content Type"], 'content_id': ["Content Id", "Content_LUID"],
+        'grantee_type': ["Grantee Type"], 'grantee_id': ["Grantee Id", "Grantee_LUID"],
+        'capability': ["Capability", "Capability_Name"], 'mode': ["Mode", "Capability_Mode"],
+        'published_at': ["AdminInsightsPublishedAt"]
+    },
+    'permissions_default': {
+        'project_id': ["Project Id", "Project_LUID"], 'grantee_type': ["GranteeType"],
+        'grantee_id': ["Grantee Id", "Grantee_LUID"], 'content_type': ["ContentType"],
+        'capability': ["CapabilityName"], 'mode': ["CapabilityMode"]
+    },
+    'group_users': {'group_id': ["Group Id", "Group_LUID"], 'user_id': ["User Id", "User_LUID"]},
+    'users': {'id': ["LUID"], 'site_role': ["SiteRole"]},
+    'projects': {
+        'id': ["LUID"], 'site_id': ["Site Id", "Site_LUID"], 'owner_id': ["Owner Id", "Owner_LUID"],
+        'content_permissions': ["ContentPermissions"], 'parent_id': ["ParentProjectId", "Parent_Project_LUID"]
+    },
+    'items': {
+        'id': ["LUID"], 'site_id': ["Site Id", "Site_LUID"], 'owner_id': ["Owner Id", "Owner_LUID"],
+        'project_id': ["Project Id", "Project_LUID"]
+    }
+}
+REQUIRED_INPUTS = {'permissions_explicit', 'users'}
+
+def _column_key(name: str) -> str:
+    key = re.sub(r"[^a-z0-9]+", "", name.lower())
+    return key[:-4] + "id" if key.endswith("luid") else key
+
+def read_table(folder: str, name: str, columns: dict):
+    """
+    Yield one dict per CSV row with just the requested fields; empty cells are
+    None, as they are once loaded into Snowflake. A missing optional file
+    reads as empty.
+    """
+    path = os.path.join(folder, INPUT_FILES[name])
+    if not os.path.exists(path):
+        if name in REQUIRED_INPUTS:
+            raise FileNotFoundError(f"{path} not found; run the matching GET script first")
+        print(f"[WARN] {path} not found; treating {name} as empty")
+        return
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        index = {_column_key(h): i for i, h in enumerate(header)}
+        positions = {}
+        for field, aliases in columns.items():
+            found = [index[_column_key(a)] for a in aliases if _column_key(a) in index]
+            if not found:
+                raise ValueError(f"{path} has no {aliases[0]!r} column")
+            positions[field] = found[0]
+        for row in reader:
+            yield {field: (row[i].strip() or None) if i < len(row) else None for field, i in positions.items()}
+
+# ==============================
+# PERMISSION INDEX
+# ==============================
+
+class PermissionIndex:
+    """
+    The extractor outputs indexed for evaluation: items, licensed users with
+    their site role value, per-user group sets, and rule maps keyed by item
+    (explicit) and by project and content type (default).
+
+    Each item type's capabilities are numbered as they are first seen, and a
+    rule map holds one (deny mask, allow mask) pair per grantee with bit n
+    set for capability n, so every capability of an item resolves in a few
+    integer operations.
+    """
+    def __init__(self, folder: str):
+        self.items = {}               # (item type, item id) -> (site id, project id, owner id)
+        self.site_roles = {}          # user id -> site role, every user
+        self.licensed = []            # (user id, site role value) for users the view keeps, in file order
+        self.user_groups = {}         # user id -> set of group ids
+        self.group_members = {}       # group id -> list of user ids
+        self.capability_bits = {}     # item type -> {capability: bit}
+        self.capability_names = {}    # item type -> [capability by bit]
+        self.minimums = {}            # item type -> [minimum site role value by bit]
+        self.published_at = {}        # item type -> [latest Admin_Insights_Published_At by bit]
+        self.explicit = {}            # (item type, item id) -> ({user: (deny, allow)}, {group: (deny, allow)})
+        self.defaults = {}            # (content type, project id) -> same shape as explicit
+        self.projects = {}            # project id -> (content permissions, parent project id)
+        self.project_owners = {}      # project id -> set of user ids
+        self._load(folder)
+
+    def _load(self, folder: str):
+        started = time.time()
+        project_rules = []
+        for row in read_table(folder, 'projects', INPUT_COLUMNS['projects']):
+            self.projects[row['id']] = (row['content_permissions'], row['parent_id'])
+            self.items.setdefault(('project', row['id']), (row['site_id'], row['id'], row['owner_id']))
+        for name, item_type in (('datasources', 'datasource'), ('flows', 'flow'),
+                                ('virtual_connections', 'virtualconnection'), ('workbooks', 'workbook')):
+            for row in read_table(folder, name, INPUT_COLUMNS['items']):
+                self.items.setdefault((item_type, row['id']), (row['site_id'], row['project_id'], row['owner_id']))
+
+        for row in read_table(folder, 'users', INPUT_COLUMNS['users']):
+            if row['id'] in self.site_roles:
+                continue
+            self.site_roles[row['id']] = row['site_role']
+            if row['site_role'] is not None and row['site_role'].lower() != 'unlicensed':
+                self.licensed.append((row['id'], SITE_ROLE_VALUES.get(row['site_role'])))
+
+        for row in read_table(folder, 'group_users', INPUT_COLUMNS['group_users']):
+            self.user_groups.setdefault(row['user_id'], set()).add(row['group_id'])
+            self.group_members.setdefault(row['group_id'], []).append(row['user_id'])
+
+        for row in read_table(folder, 'permissions_explicit', INPUT_COLUMNS['permissions_explicit']):
+            item_type = (row['content_type'] or '')[:-1].lower()
+            capability = row['capability']
+            if capability is not None and 'project' in capability.lower():
+                project_rules.append(row)
+                continue
+            if item_type not in ITEM_TYPES or capability is None:
+                continue
+            # Capabilities seen on any item of a type are the ones the view evaluates for every item of it
+            bit = self._capability_bit(item_type, capability)
+            known = self.published_at[item_type][bit]
+            self.published_at[item_type][bit] = max(filter(None, (row['published_at'], known)), default=None)
+            self._add_rule(self.explicit, (item_type, row['content_id']), 1 << bit, row)
+
+        for row in read_table(folder, 'permissions_default', INPUT_COLUMNS['permissions_default']):
+            content_type = (row['content_type'] or '').lower()
+            bit = self.capability_bits.get(content_type, {}).get(row['capability'])
+            if bit is not None:
+                self._add_rule(self.defaults, (content_type, row['project_id']), 1 << bit, row)
+
+        self.controlling = {p: self.controlling_project(p) for p in self.projects}
+        self._index_project_owners(project_rules)
+        print_progress(f"Indexed {len(self.items)} items, {len(self.licensed)} licensed users, "
+                       f"{len(self.explicit)} items with explicit rules in {time.time() - started:.2f}s")
+
+    def _capability_bit(self, item_type: str, capability: str) -> int:
+        bits = self.capability_bits.setdefault(item_type, {})
+        if capability not in bits:
+            bits[capability] = len(bits)
+            self.capability_names.setdefault(item_type, []).append(capability)
+            self.minimums.setdefault(item_type, []).append(MINIMUM_SITE_ROLE[item_type].get(capability.lower()))
+            self.published_at.setdefault(item_type, []).append(None)
+        return bits[capability]
+
+    def _add_rule(self, rules: dict, key, bit_mask: int, row):
+        grantee_type = (row['grantee_type'] or '').lower()
+        if grantee_type not in ('user', 'group'):
+            return
+        by_grantee = rules.setdefault(key, ({}, {}))[grantee_type == 'group']
+        deny, allow = by_grantee.get(row['grantee_id'], (0, 0))
+        if row['mode'] == 'Deny':
+            deny |= bit_mask
+        elif row['mode'] == 'Allow':
+            allow |= bit_mask
+        by_grantee[row['grantee_id']] = (deny, allow)
+
+    def all_bits(self, item_type: str) -> int:
+        return (1 << len(self.capability_names.get(item_type, []))) - 1
+
+    def below_minimum_mask(self, item_type: str, role_value) -> int:
+        """Capabilities of the type whose minimum site role value is above the user's"""
+        if role_value is None:
+            return 0
+        return sum(1 << bit for bit, minimum in enumerate(self.minimums.get(item_type, []))
+                   if minimum is not None and role_value < minimum)
+
+    def controlling_project(self, project_id: str, max_levels: int = 20) -> str:
+        """
+        VW_DEFAULT_PROJECT_PERMISSIONS: walk up while the parent locks its
+        permissions; the last project reached controls the defaults.
+        """
+        current = project_id
+        for _ in range(max_levels + 1):
+            parent = self.projects[current][1]
+            if parent not in self.projects or self.projects[parent][0] != 'LockedToProject':
+                return current
+            current = parent
+        return project_id  # Chain deeper than the view's safety limit: the view falls back to the project itself
+
+    def _index_project_owners(self, project_rules: list):
+        """Users with any *Project* capability (e.g. ProjectLeader) on a project or on its controlling project"""
+        holders = {}
+        for row in project_rules:
+            if row['grantee_type'] == 'Group':
+                users = self.group_members.get(row['grantee_id'], [])
+            elif row['grantee_type'] == 'User':
+                users = [row['grantee_id']]
+            else:
+                continue
+            holders.setdefault(row['content_id'], set()).update(users)
+        for project_id, controlling in self.controlling.items():
+            owners = holders.get(project_id, set()) | holders.get(controlling, set())
+            if owners:
+                self.project_owners[project_id] = owners
+
+# ==============================
+# EVALUATION
+# ==============================
+
+def _layered(explicit_deny: int, explicit_allow: int, default_deny: int, default_allow: int):
+    """Per capability bit: explicit deny, explicit allow, then the project default deny / allow"""
+    explicit = explicit_deny | explicit_allow
+    deny = explicit_deny | (default_deny & ~explicit_allow)
+    allow = (explicit_allow & ~explicit_deny) | (default_allow & ~default_deny & ~explicit)
+    return deny, allow
+
+class EffectivePermissions:
+    """
+    Evaluates the view's CASE expression for every capability of an item at
+    once as bitmasks: the result for a user is a set of disjoint masks, one
+    per Capability_Source. Python ints are used per user; with NumPy, whole
+    blocks of items are resolved against every licensed user as unsigned
+    integer arrays.
+    """
+    def __init__(self, index: PermissionIndex, include_undefined: bool = INCLUDE_UNDEFINED, use_numpy: bool = np is not None):
+        self.index = index
+        self.include_undefined = include_undefined
+        self.use_numpy = use_numpy and np is not None
+        self.admins = [u for u, _ in index.licensed if index.site_roles.get(u) in SITE_ADMIN_ROLES]
+        self._order = {u: n for n, (u, _) in enumerate(index.licensed)}
+        self._below = {}
+        self._vectors = None
+
+    def below_minimum(self, item_type: str) -> dict:
+        """user id -> mask of capabilities outside the user's site role, for users with any"""
+        if item_type not in self._below:
+            masks = {}
+            for user_id, value in self.index.licensed:
+                mask = self.index.below_minimum_mask(item_type, value)
+                if mask:
+                    masks[user_id] = mask
+            self._below[item_type] = masks
+        return self._below[item_type]
+
+    def _item_context(self, item_type: str, item_id: str):
+        index = self.index
+        site_id, project_id, owner_id = index.items[(item_type, item_id)]
+        content_permissions = index.projects.get(project_id, (None, None))[0]
+        defaults_apply = content_permissions is not None and content_permissions != 'ManagedByOwner'
+        explicit = index.explicit.get((item_type, item_id), ({}, {}))
+        default = index.defaults.get((item_type, project_id), ({}, {})) if defaults_apply else ({}, {})
+        return site_id, project_id, owner_id, explicit, default
+
+    def resolve(self, user_id: str, item_type: str, item_id: str, context=None) -> list:
+        """[(source code, capability mask)] for one user on one item; the masks are disjoint"""
+        index = self.index
+        _, project_id, owner_id, explicit, default = context or self._item_context(item_type, item_id)
+        all_bits = index.all_bits(item_type)
+        if index.site_roles.get(user_id) in SITE_ADMIN_ROLES:
+            return [(SITE_ADMIN, all_bits)]
+        result = []
+        if user_id in self._order:
+            below = self.below_minimum(item_type).get(user_id, 0)
+        else:
+            below = index.below_minimum_mask(item_type, SITE_ROLE_VALUES.get(index.site_roles.get(user_id)))
+        if below:
+            result.append((OUTSIDE_SCOPE, below))
+        rest = all_bits & ~below
+        if not rest:
+            return result
+        if user_id in index.project_owners.get(project_id, ()):
+            return result + [(PROJECT_OWNER, rest)]
+        if owner_id == user_id:
+            return result + [(CONTENT_OWNER, rest)]
+        deny, allow = _layered(*explicit[0].get(user_id, (0, 0)), *default[0].get(user_id, (0, 0)))
+        for code, mask in ((USER_DENIED, deny & rest), (USER_ALLOWED, allow & rest)):
+            if mask:
+                result.append((code, mask))
+        rest &= ~(deny | allow)
+        if rest:
+            explicit_deny = explicit_allow = default_deny = default_allow = 0
+            for group_id in index.user_groups.get(user_id, ()):
+                d, a = explicit[1].get(group_id, (0, 0))
+                explicit_deny |= d
+                explicit_allow |= a
+                d, a = default[1].get(group_id, (0, 0))
+                default_deny |= d
+                default_allow |= a
+            deny, allow = _layered(explicit_deny, explicit_allow, default_deny, default_allow)
+            for code, mask in ((GROUP_DENIED, deny & rest), (GROUP_ALLOWED, allow & rest)):
+                if mask:
+                    result.append((code, mask))
+            rest &= ~(deny | allow)
+        if rest:
+            result.append((UNDEFINED, rest))
+        return result
+
+    def capability_results(self, user_id: str, item_type: str, item_id: str) -> dict:
+        """capability -> (mode, source) for one user on one item, exactly as the output rows have it"""
+        if (item_type, item_id) not in self.index.items or user_id not in self._order:
+            return {}
+        names = self.index.capability_names.get(item_type, [])
+        results = {}
+        for code, mask in self.resolve(user_id, item_type, item_id):
+            if code == UNDEFINED and not self.include_undefined:
+                continue
+            for bit, capability in enumerate(names):
+                if mask >> bit & 1:
+                    results[capability] = SOURCES[code]
+        return results
+
+    def item_users(self, item_type: str, item_id: str) -> list:
+        """Users that can have rows for the item"""
+        _, project_id, owner_id, explicit, default = self._item_context(item_type, item_id)
+        return self._candidates(item_type, project_id, owner_id, explicit, default)
+
+    def capability_users(self, item_type: str, item_id: str, capability: str) -> list:
+        """(user id, source code) for each user with a row for one capability of the item"""
+        bit = self.index.capability_bits.get(item_type, {}).get(capability)
+        if bit is None or (item_type, item_id) not in self.index.items:
+            return []
+        context = self._item_context(item_type, item_id)
+        _, project_id, owner_id, explicit, default = context
+        found = []
+        for user_id in self._candidates(item_type, project_id, owner_id, explicit, default, bit):
+            for code, mask in self.resolve(user_id, item_type, item_id, context):
+                if mask >> bit & 1:
+                    if code != UNDEFINED or self.include_undefined:
+                        found.append((user_id, code))
+                    break
+        return found
+
+    def _candidates(self, item_type: str, project_id, owner_id, explicit, default, bit=None):
+        """
+        Licensed users some rule or role can decide on the item, in user file
+        order. With a capability bit, only rules and roles covering it count.
+        """
+        if self.include_undefined:
+            return [u for u, _ in self.index.licensed]
+        found = set(self.admins)
+        found.update(self.index.project_owners.get(project_id, ()))
+        found.add(owner_id)
+        if bit is None:
+            found.update(self.below_minimum(item_type))
+            for rules in (explicit, default):
+                found.update(rules[0])
+                for group_id in rules[1]:
+                    found.update(self.index.group_members.get(group_id, ()))
+        else:
+            found.update(u for u, mask in self.below_minimum(item_type).items() if mask >> bit & 1)
+            for rules in (explicit, default):
+                found.update(u for u, (deny, allow) in rules[0].items() if (deny | allow) >> bit & 1)
+                for group_id, (deny, allow) in rules[1].items():
+                    if (deny | allow) >> bit & 1:
+                        found.update(self.index.group_members.get(group_id, ()))
+        return sorted((u for u in found if u in self._order), key=self._order.get)
+
+    def item_rows(self, item_type: str, item_id: str):
+        """Yield the view's rows for one item, by capability then user"""
+        context = self._item_context(item_type, item_id)
+        site_id, project_id, owner_id, explicit, default = context
+        resolved = [(user_id, self.resolve(user_id, item_type, item_id, context))
+                    for user_id in self._candidates(item_type, project_id, owner_id, explicit, default)]
+        names = self.index.capability_names.get(item_type, [])
+        published = self.index.published_at.get(item_type, [])
+        for bit, capability in enumerate(names):
+            flag = 1 << bit
+            for user_id, masks in resolved:
+                for code, mask in masks:
+                    if mask & flag:
+                        if code != UNDEFINED or self.include_undefined:
+                            mode, source = SOURCES[code]
+                            yield (site_id, item_type, item_id, user_id, project_id, capability, mode, source, published[bit])
+                        break
+
+    # ---------- NumPy blocks ----------
+
+    def _user_vectors(self):
+        """Per licensed user arrays shared by every block: admin flags, group member indexes, below-minimum masks"""
+        if self._vectors is None:
+            index = self.index
+            is_admin = np.array([index.site_roles.get(u) in SITE_ADMIN_ROLES for u, _ in index.licensed], dtype=bool)
+            members = {}
+            for group_id, users in index.group_members.items():
+                positions = sorted({self._order[u] for u in users if u in self._order})
+                if positions:
+                    members[group_id] = np.array(positions, dtype=np.intp)
+            self._vectors = {'admin': is_admin, 'members': members, 'below': {}}
+        return self._vectors
+
+    def _below_vector(self, item_type: str):
+        vectors = self._user_vectors()
+        if item_type not in vectors['below']:
+            masks = self.below_minimum(item_type)
+            vectors['below'][item_type] = np.array([masks.get(u, 0) for u, _ in self.index.licensed], dtype=self._mask_dtype(item_type))
+        return vectors['below'][item_type]
+
+    def _mask_dtype(self, item_type: str):
+        """Narrowest unsigned dtype holding one bit per capability of the type"""
+        n_bits = len(self.index.capability_names.get(item_type, []))
+        return np.dtype(next(t for t, width in ((np.uint8, 8), (np.uint16, 16), (np.uint32, 32), (np.uint64, 64)) if n_bits <= width))
+
+    def resolve_block(self, item_type: str, item_ids: list) -> list:
+        """
+        Resolve items of one type against every licensed user. Returns
+        [(source code, masks)] with masks an (items, users) array of the
+        type's mask dtype, or a (users,) array for the sources that don't
+        depend on the item. Group rules are applied densely; user rules and
+        owners touch few cells and are applied to just those.
+        """
+        vectors = self._user_vectors()
+        members = vectors['members']
+        shape = (len(item_ids), len(self.index.licensed))
+        dtype = self._mask_dtype(item_type)
+        group_layers = {name: np.zeros(shape, dtype=dtype) for name in
+                        ('explicit_deny', 'explicit_allow', 'default_deny', 'default_allow')}
+        user_cells = {}   # (item, user) -> [explicit deny, explicit allow, default deny, default allow]
+        owner_cells = {}  # (item, user) -> PROJECT_OWNER or CONTENT_OWNER
+        for i, item_id in enumerate(item_ids):
+            _, project_id, owner_id, explicit, default = self._item_context(item_type, item_id)
+            for offset, kind, rules in ((0, 'explicit', explicit), (2, 'default', default)):
+                for user_id, (deny, allow) in rules[0].items():
+                    j = self._order.get(user_id)
+                    if j is not None:
+                        cell = user_cells.setdefault((i, j), [0, 0, 0, 0])
+                        cell[offset] |= deny
+                        cell[offset + 1] |= allow
+                for group_id, (deny, allow) in rules[1].items():
+                    positions = members.get(group_id)
+                    if positions is not None:
+                        group_layers[f'{kind}_deny'][i, positions] |= deny
+                        group_layers[f'{kind}_allow'][i, positions] |= allow
+            for user_id in self.index.project_owners.get(project_id, ()):
+                if user_id in self._order:
+                    owner_cells[(i, self._order[user_id])] = PROJECT_OWNER
+            if owner_id in self._order:
+                owner_cells.setdefault((i, self._order[owner_id]), CONTENT_OWNER)
+
+        all_bits = dtype.type(self.index.all_bits(item_type))
+        zero = dtype.type(0)
+        admin = vectors['admin']
+        below = np.where(admin, zero, self._below_vector(item_type))
+        rest = np.broadcast_to(np.where(admin, zero, all_bits & ~below), shape).copy()
+        sources = [(SITE_ADMIN, np.where(admin, all_bits, zero)), (OUTSIDE_SCOPE, below)]
+        for code in (PROJECT_OWNER, CONTENT_OWNER):
+            masks = np.zeros(shape, dtype=dtype)
+            cells = [cell for cell, owner in owner_cells.items() if owner == code]
+            if cells:
+                rows, cols = np.array(cells, dtype=np.intp).T
+                masks[rows, cols] = rest[rows, cols]
+                rest[rows, cols] = zero
+            sources.append((code, masks))
+        user_deny = np.zeros(shape, dtype=dtype)
+        user_allow = np.zeros(shape, dtype=dtype)
+        if user_cells:
+            rows, cols = np.array(list(user_cells), dtype=np.intp).T
+            deny, allow = _layered(*np.array(list(user_cells.values()), dtype=dtype).T)
+            remaining = rest[rows, cols]
+            user_deny[rows, cols] = deny & remaining
+            user_allow[rows, cols] = allow & remaining
+            rest[rows, cols] = remaining & ~(deny | allow)
+        sources += [(USER_DENIED, user_deny), (USER_ALLOWED, user_allow)]
+        deny, allow = _layered(group_layers['explicit_deny'], group_layers['explicit_allow'],
+                               group_layers['default_deny'], group_layers['default_allow'])
+        sources += [(GROUP_DENIED, deny & rest), (GROUP_ALLOWED, allow & rest)]
+        rest &= ~(deny | allow)
+        sources.append((UNDEFINED, rest))
+        return sources
+
+    def block_rows(self, item_type: str, item_ids: list):
+        """Yield the rows of a resolved block in the same order as item_rows"""
+        shape = (len(item_ids), len(self.index.licensed))
+        n_bits = len(self.index.capability_names.get(item_type, []))
+        parts = []
+        for code, masks in self.resolve_block(item_type, item_ids):
+            if code == UNDEFINED and not self.include_undefined:
+                continue
+            masks = np.broadcast_to(masks, shape)
+            items, users = np.nonzero(masks)
+            if not len(items):
+                continue
+            values = masks[items, users]
+            for bit in range(n_bits):
+                hit = (values >> bit) & 1 == 1
+                if hit.any():
+                    parts.append((items[hit], users[hit], np.full(int(hit.sum()), bit), np.full(int(hit.sum()), code)))
+        if not parts:
+            return
+        items, users, bits, codes = (np.concatenate(p) for p in zip(*parts))
+        order = np.lexsort((users, bits, items))
+        names = self.index.capability_names[item_type]
+        published = self.index.published_at[item_type]
+        user_ids = [u for u, _ in self.index.licensed]
+        for i, j, bit, code in zip(items[order].tolist(), users[order].tolist(), bits[order].tolist(), codes[order].tolist()):
+            site_id, project_id, _ = self.index.items[(item_type, item_ids[i])]
+            mode, source = SOURCES[code]
+            yield (site_id, item_type, item_ids[i], user_ids[j], project_id, names[bit], mode, source, published[bit])
+
+    def rows(self):
+        """Every row of the view, item by item"""
+        by_type = {}
+        for item_type, item_id in self.index.items:
+            by_type.setdefault(item_type, []).append(item_id)
+        users = max(1, len(self.index.licensed))
+        for item_type, item_ids in by_type.items():
+            # NumPy masks hold up to 64 capabilities; wider types stay on Python ints
+            if self.use_numpy and self.index.licensed and len(self.index.capability_names.get(item_type, [])) <= 64:
+                step = max(1, NUMPY_BLOCK_CELLS // users)
+                for start in range(0, len(item_ids), step):
+                    yield from self.block_rows(item_type, item_ids[start:start + step])
+            else:
+                for item_id in item_ids:
+                    yield from self.item_rows(item_type, item_id)
+
+# ==============================
+# INCREMENTAL
+# ==============================
+
+def incremental_requested() -> bool:
+    return INCREMENTAL or "--incremental" in sys.argv
+
+def stage_inputs(folder: str) -> str:
+    """
+    Copy this run's inputs next to STATE_FOLDER and read them from there, so
+    what the next run diffs against is exactly what this run computed from.
+    """
+    staged = f"{STATE_FOLDER}.staged"
+    shutil.rmtree(staged, ignore_errors=True)
+    os.makedirs(staged)
+    for name in INPUT_FILES.values():
+        if os.path.exists(os.path.join(folder, name)):
+            shutil.copy2(os.path.join(folder, name), os.path.join(staged, name))
+    return staged
+
+def promote_inputs(staged: str):
+    """The staged inputs become the previous run's state once the outputs are written"""
+    shutil.rmtree(STATE_FOLDER, ignore_errors=True)
+    os.replace(staged, STATE_FOLDER)
+
+def _rule_changes(old_rules: tuple, new_rules: tuple, members) -> set:
+    """Users whose own or group (deny, allow) masks differ between two rule maps"""
+    users = {u for u in old_rules[0].keys() | new_rules[0].keys() if old_rules[0].get(u) != new_rules[0].get(u)}
+    for group_id in old_rules[1].keys() | new_rules[1].keys():
+        if old_rules[1].get(group_id) != new_rules[1].get(group_id):
+            users |= members(group_id)
+    return users
+
+def find_affected(old: PermissionIndex, new: PermissionIndex):
+    """
+    What changed between two runs' inputs, as (items to redo for every user,
+    users to redo on every item, {item: users to redo}).
+    """
+    whole_items, whole_users, pairs = set(), set(), {}
+    no_rules = ({}, {})
+
+    def members(group_id):
+        return set(old.group_members.get(group_id, ())) | set(new.group_members.get(group_id, ()))
+
+    def add(keys, users):
+        if users:
+            for key in keys:
+                pairs.setdefault(key, set()).update(users)
+
+    items_in_project = {}
+    for index in (old, new):
+        for key, (_, project_id, _) in index.items.items():
+            items_in_project.setdefault(project_id, set()).add(key)
+
+    # Masks only compare while both runs number a type's capabilities the same way
+    changed_types = {t for t in ITEM_TYPES if old.capability_names.get(t) != new.capability_names.get(t)}
+    for key in old.items.keys() | new.items.keys():
+        if key[0] in changed_types or old.items.get(key) != new.items.get(key):
+            whole_items.add(key)
+    for user_id in old.site_roles.keys() | new.site_roles.keys():
+        if old.site_roles.get(user_id) != new.site_roles.get(user_id):
+            whole_users.add(user_id)
+    # A project's content permissions decide whether its defaults apply to the items in it
+    for project_id in old.projects.keys() | new.projects.keys():
+        if old.projects.get(project_id, (None, None))[0] != new.projects.get(project_id, (None, None))[0]:
+            whole_items.update(items_in_project.get(project_id, ()))
+    for project_id in old.project_owners.keys() | new.project_owners.keys():
+        add(items_in_project.get(project_id, ()),
+            old.project_owners.get(project_id, set()) ^ new.project_owners.get(project_id, set()))
+
+    for key in old.explicit.keys() | new.explicit.keys():
+        add([key], _rule_changes(old.explicit.get(key, no_rules), new.explicit.get(key, no_rules), members))
+    for content_type, project_id in old.defaults.keys() | new.defaults.keys():
+        users = _rule_changes(old.defaults.get((content_type, project_id), no_rules),
+                              new.defaults.get((content_type, project_id), no_rules), members)
+        add([k for k in items_in_project.get(project_id, ()) if k[0] == content_type], users)
+
+    # A user joining or leaving a group is redone wherever that group has a rule
+    explicit_by_group, defaults_by_group = {}, {}
+    for index in (old, new):
+        for key, (_, groups) in index.explicit.items():
+            for group_id in groups:
+                explicit_by_group.setdefault(group_id, set()).add(key)
+        for (content_type, project_id), (_, groups) in index.defaults.items():
+            for group_id in groups:
+                defaults_by_group.setdefault(group_id, set()).update(
+                    k for k in items_in_project.get(project_id, ()) if k[0] == content_type)
+    for user_id in old.user_groups.keys() | new.user_groups.keys():
+        for group_id in old.user_groups.get(user_id, set()) ^ new.user_groups.get(user_id, set()):
+            add(explicit_by_group.get(group_id, ()), {user_id})
+            add(defaults_by_group.get(group_id, ()), {user_id})
+    return whole_items, whole_users, pairs
+
+def delta_rows(old: EffectivePermissions, new: EffectivePermissions, whole_items: set, whole_users: set, pairs: dict):
+    """Yield the rows that differ between two runs for the affected (item, user) pairs, plus a Change_Type"""
+    keys = list(new.index.items) + [k for k in old.index.items if k not in new.index.items]
+    for key in keys:
+        users = set(pairs.get(key, ())) | whole_users
+        if key in whole_items:
+            for engine in (old, new):
+                if key in engine.index.items:
+                    users.update(engine.item_users(*key))
+        if not users:
+            continue
+        item = new.index.items.get(key) or old.index.items[key]
+        ordered = sorted(users, key=lambda u: (new._order.get(u, len(new._order)), u))
+        changes = []
+        for user_id in ordered:
+            before = old.capability_results(user_id, *key)
+            after = new.capability_results(user_id, *key)
+            if before != after:
+                changes.append((user_id, before, after))
+        names = list(new.index.capability_names.get(key[0], []))
+        names += [c for c in old.index.capability_names.get(key[0], []) if c not in names]
+        for capability in names:
+            for user_id, before, after in changes:
+                if before.get(capability) == after.get(capability):
+                    continue
+                index = new.index if capability in after else old.index
+                published_at = index.published_at[key[0]][index.capability_bits[key[0]][capability]]
+                mode, source = after.get(capability) or before[capability]
+                change = 'Added' if capability not in before else 'Removed' if capability not in after else 'Changed'
+                yield (item[0], key[0], key[1], user_id, item[1], capability, mode, source, published_at, change)
+
+# ==============================
+# WRITE CSV
+# ==============================
+
+def write_rows(rows, path: str, columns: list = VIEW_COLUMNS) -> int:
+    """Stream rows to the CSV under the view's column names; replaced atomically when complete"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    count = 0
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(columns)
+        for row in rows:
+            w.writerow(row)
+            count += 1
+    os.replace(tmp, path)
+    return count
+
+# ==============================
+# MAIN
+# ==============================
+
+def main():
+    started = time.time()
+    print_progress(f"Started at {datetime.now(timezone.utc).isoformat()}")
+    include_undefined = INCLUDE_UNDEFINED or "--include-undefined" in sys.argv
+    staged = stage_inputs(SHARED_FOLDER)
+    engine = EffectivePermissions(PermissionIndex(staged), include_undefined,
+                                  use_numpy=np is not None and "--no-numpy" not in sys.argv)
+    if incremental_requested() and os.path.isdir(STATE_FOLDER):
+        previous = EffectivePermissions(PermissionIndex(STATE_FOLDER), include_undefined)
+        whole_items, whole_users, pairs = find_affected(previous.index, engine.index)
+        print_progress(f"Changed since the previous run: {len(whole_items)} items for every user, "
+                       f"{len(whole_users)} users on every item, {sum(len(u) for u in pairs.values())} (item, user) pairs")
+        count = write_rows(delta_rows(previous, engine, whole_items, whole_users, pairs),
+                           DELTA_CSV_PATH, VIEW_COLUMNS + ["Change_Type"])
+        print_progress(f"Wrote {count} changed effective permission rows → {DELTA_CSV_PATH}")
+    else:
+        if incremental_requested():
+            print_progress(f"No previous run in {STATE_FOLDER}; writing the full result")
+        print_progress(f"Resolving with {'NumPy blocks' if engine.use_numpy else 'Python bitsets'}")
+        count = write_rows(engine.rows(), OUTPUT_CSV_PATH)
+        print_progress(f"Wrote {count} effective permission rows → {OUTPUT_CSV_PATH}")
+    promote_inputs(staged)
+    print(f"[INFO] Duration: {time.time() - started:.2f} seconds")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
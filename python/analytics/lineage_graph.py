@@ -0,0 +1,374 @@
+# ==============================
+# USER VARIABLES (EDIT HERE)
+# ==============================
+
+import os
+
+# Loads the lineage outputs of "GET db_connections_lineage.py" into an
+# adjacency index (databases → tables → datasources, virtual connections,
+# flows and workbooks), so "what depends on table X" is a graph walk instead
+# of a scan of every CSV. The index is saved as one memory-mappable file that
+# later runs open without parsing anything.
+
+SHARED_FOLDER = "C:/Path/To/Your/Shared/Folder"  # Where the GET scripts write their CSVs
+INPUT_FILES = {
+    'databases': "REST_db_connection_lineage_databases.csv",
+    'tables': "REST_db_connection_lineage_tables.csv",
+    'datasource': "REST_db_connection_datasource_details.csv",
+    'flow': "REST_db_connection_flow_details.csv",
+    'virtualconnection': "REST_db_connection_virtual_connection_details.csv",
+    'workbook': "REST_db_connection_workbook_details.csv"
+}
+GRAPH_PATH = os.path.join(SHARED_FOLDER, "LOCAL_lineage_graph.bin")  # Rebuilt when any input CSV is newer, or with --rebuild
+
+# Queries (command line), by LUID or by exact name (table names match the full name too):
+#   --downstream <node>   everything that depends on the node
+#   --upstream <node>     everything the node depends on
+#   --impact <node>       what a change to the node reaches, counted by type
+#   --depth N             stop after N hops
+#   --output <path>       write the result CSV there instead of to the console
+
+# ==============================
+# LIBRARIES
+# ==============================
+
+import argparse
+import csv
+import mmap
+import re
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime, timezone
+
+# ==============================
+# LOGGING
+# ==============================
+
+def print_progress(message: str):
+    print(f"[PROGRESS] {message}", flush=True)
+
+# ==============================
+# LOAD INPUTS
+# ==============================
+
+# Node types, upstream first; values match Item_Type in VW_ALL_DB_CONNECTION_DETAILS
+NODE_TYPES = ('database', 'table', 'datasource', 'virtualconnection', 'flow', 'workbook')
+
+# Column prefix of the content id and name in each details file
+CONTENT_PREFIXES = {
+    'datasource': "Datasource",
+    'flow': "Flow",
+    'virtualconnection': "Virtual Connection",
+    'workbook': "Workbook"
+}
+
+def _column_key(name: str) -> str:
+    """'Table Id', 'Table_LUID' and 'table_id' all read as the same column"""
+    key = re.sub(r"[^a-z0-9]+", "", name.lower())
+    return key[:-4] + "id" if key.endswith("luid") else key
+
+def read_table(folder: str, name: str, columns: dict):
+    """
+    Yield one dict per CSV row with just the requested fields; empty cells are
+    None. A missing file reads as empty.
+    """
+    path = os.path.join(folder, INPUT_FILES[name])
+    if not os.path.exists(path):
+        print(f"[WARN] {path} not found; treating {name} as empty")
+        return
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        index = {_column_key(h): i for i, h in enumerate(header)}
+        positions = {}
+        for field, column in columns.items():
+            if _column_key(column) not in index:
+                raise ValueError(f"{path} has no {column!r} column")
+            positions[field] = index[_column_key(column)]
+        for row in reader:
+            yield {field: (row[i].strip() or None) if i < len(row) else None for field, i in positions.items()}
+
+# ==============================
+# GRAPH FILE
+# ==============================
+
+# Header, then uint32 arrays in GRAPH_ARRAYS order, then the UTF-8 ids and names.
+# Nodes are sorted by id so a lookup is a binary search over the mapped text.
+GRAPH_MAGIC = b"TMILGRPH"
+GRAPH_VERSION = 1
+GRAPH_HEADER = struct.Struct("<8sBBxxIII")  # magic, version, byte order, nodes, edges, text bytes
+GRAPH_ARRAYS = ('types', 'down_offsets', 'down_targets', 'up_offsets', 'up_targets', 'id_offsets', 'name_offsets')
+BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+
+def _array_lengths(node_count: int, edge_count: int) -> dict:
+    return {
+        'types': node_count,
+        'down_offsets': node_count + 1, 'down_targets': edge_count,
+        'up_offsets': node_count + 1, 'up_targets': edge_count,
+        'id_offsets': node_count + 1, 'name_offsets': node_count + 1
+    }
+
+def _adjacency(node_count: int, edges: list):
+    """CSR arrays (offsets, targets) for sorted edges packed as source << 32 | target"""
+    offsets = array('I', [0]) * (node_count + 1)
+    for edge in edges:
+        offsets[(edge >> 32) + 1] += 1
+    for i in range(node_count):
+        offsets[i + 1] += offsets[i]
+    return offsets, array('I', (edge & 0xFFFFFFFF for edge in edges))
+
+def build_graph(folder: str) -> bytes:
+    """Read the lineage CSVs and return the serialized graph"""
+    node_index, node_ids, node_types, node_names = {}, [], [], []
+    edges = set()  # source << 32 | target, in first-seen node numbering
+
+    def add_node(node_id, node_type, name):
+        index = node_index.get(node_id)
+        if index is None:
+            index = node_index[node_id] = len(node_ids)
+            node_ids.append(node_id)
+            node_types.append(NODE_TYPES.index(node_type))
+            node_names.append(name)
+        elif name and not node_names[index]:
+            node_names[index] = name
+        return index
+
+    for row in read_table(folder, 'databases', {'id': "Database Id", 'name': "Database Name"}):
+        if row['id']:
+            add_node(row['id'], 'database', row['name'])
+    table_columns = {'table_id': "Table Id", 'table_name': "Table Name", 'full_name': "Table FullName",
+                     'database_id': "Database Id"}
+    for row in read_table(folder, 'tables', table_columns):
+        if row['table_id']:
+            table = add_node(row['table_id'], 'table', row['full_name'] or row['table_name'])
+            if row['database_id']:
+                edges.add(add_node(row['database_id'], 'database', None) << 32 | table)
+    for content_type, prefix in CONTENT_PREFIXES.items():
+        columns = dict(table_columns, id=f"{prefix} Id", name=f"{prefix} Name", database_name="Database Name")
+        for row in read_table(folder, content_type, columns):
+            if not row['id']:
+                continue
+            content = add_node(row['id'], content_type, row['name'])
+            if row['table_id']:
+                table = add_node(row['table_id'], 'table', row['full_name'] or row['table_name'])
+                edges.add(table << 32 | content)
+                if row['database_id']:
+                    edges.add(add_node(row['database_id'], 'database', row['database_name']) << 32 | table)
+    if not node_ids:
+        raise ValueError(f"No lineage rows found in {folder}; run GET db_connections_lineage.py first")
+
+    order = sorted(range(len(node_ids)), key=lambda i: node_ids[i].encode("utf-8"))
+    rank = array('I', [0]) * len(order)
+    for position, i in enumerate(order):
+        rank[i] = position
+    down = sorted(rank[edge >> 32] << 32 | rank[edge & 0xFFFFFFFF] for edge in edges)
+    up = sorted((edge & 0xFFFFFFFF) << 32 | edge >> 32 for edge in down)
+    arrays = {'types': array('I', (node_types[i] for i in order))}
+    arrays['down_offsets'], arrays['down_targets'] = _adjacency(len(order), down)
+    arrays['up_offsets'], arrays['up_targets'] = _adjacency(len(order), up)
+
+    text = bytearray()
+    for field, values in (('id_offsets', node_ids), ('name_offsets', node_names)):
+        offsets = array('I', [len(text)])
+        for i in order:
+            text += (values[i] or "").encode("utf-8")
+            offsets.append(len(text))
+        arrays[field] = offsets
+    if len(text) >= 2 ** 32:
+        raise ValueError("Lineage text exceeds 4 GB; the graph file uses 32-bit offsets")
+
+    parts = [GRAPH_HEADER.pack(GRAPH_MAGIC, GRAPH_VERSION, BYTE_ORDER, len(order), len(down), len(text))]
+    parts += [arrays[name].tobytes() for name in GRAPH_ARRAYS]
+    parts.append(bytes(text))
+    return b"".join(parts)
+
+# ==============================
+# LINEAGE GRAPH
+# ==============================
+
+class LineageGraph:
+    """
+    Read-only lineage graph over a serialized buffer: bytes fresh from
+    build_graph, or the graph file mapped into memory by open(). Nodes are
+    integer indexes; edges point downstream (database → table → content) and
+    are also indexed in reverse for upstream walks.
+    """
+    def __init__(self, buffer):
+        magic, version, byte_order, node_count, edge_count, text_bytes = GRAPH_HEADER.unpack_from(buffer, 0)
+        if magic != GRAPH_MAGIC or version != GRAPH_VERSION or byte_order != BYTE_ORDER:
+            raise ValueError("not a lineage graph file for this version and platform")
+        self.buffer = buffer
+        self.node_count = node_count
+        self.edge_count = edge_count
+        view = memoryview(buffer)
+        offset = GRAPH_HEADER.size
+        for name, length in _array_lengths(node_count, edge_count).items():
+            setattr(self, name, view[offset:offset + 4 * length].cast('I'))
+            offset += 4 * length
+        self.text = view[offset:offset + text_bytes]
+        if len(self.text) != text_bytes:
+            raise ValueError("lineage graph file is truncated")
+
+    @classmethod
+    def open(cls, path: str):
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.buffer)
+        os.replace(tmp, path)
+
+    def node_id(self, index: int) -> str:
+        return str(self.text[self.id_offsets[index]:self.id_offsets[index + 1]], "utf-8")
+
+    def node_name(self, index: int) -> str:
+        return str(self.text[self.name_offsets[index]:self.name_offsets[index + 1]], "utf-8")
+
+    def node_type(self, index: int) -> str:
+        return NODE_TYPES[self.types[index]]
+
+    def find(self, node_id: str):
+        """Index of the node with this id, or None"""
+        key = node_id.encode("utf-8")
+        low, high = 0, self.node_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.text[self.id_offsets[middle]:self.id_offsets[middle + 1]].tobytes() < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.node_count and self.text[self.id_offsets[low]:self.id_offsets[low + 1]].tobytes() == key:
+            return low
+        return None
+
+    def lookup(self, key: str) -> list:
+        """Nodes matching an id, or else every node whose name matches (case-insensitive)"""
+        index = self.find(key)
+        if index is not None:
+            return [index]
+        key = key.casefold()
+        return [i for i in range(self.node_count) if self.node_name(i).casefold() == key]
+
+    def walk(self, starts: list, downstream: bool = True, max_depth=None) -> list:
+        """(index, hops) of every node reachable from the starts, nearest first"""
+        offsets, targets = (self.down_offsets, self.down_targets) if downstream else (self.up_offsets, self.up_targets)
+        seen = bytearray(self.node_count)
+        for start in starts:
+            seen[start] = 1
+        frontier, reached, depth = list(starts), [], 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            following = []
+            for index in frontier:
+                for target in targets[offsets[index]:offsets[index + 1]]:
+                    if not seen[target]:
+                        seen[target] = 1
+                        following.append(target)
+                        reached.append((target, depth))
+            frontier = following
+        return reached
+
+    def downstream(self, starts: list, max_depth=None) -> list:
+        return self.walk(starts, True, max_depth)
+
+    def upstream(self, starts: list, max_depth=None) -> list:
+        return self.walk(starts, False, max_depth)
+
+    def impact(self, starts: list, max_depth=None) -> dict:
+        """Downstream nodes grouped by type, in NODE_TYPES order"""
+        by_type = {node_type: [] for node_type in NODE_TYPES}
+        for index, depth in self.downstream(starts, max_depth):
+            by_type[self.node_type(index)].append((index, depth))
+        return {node_type: found for node_type, found in by_type.items() if found}
+
+def graph_is_current(folder: str, path: str) -> bool:
+    if not os.path.exists(path):
+        return False
+    built = os.path.getmtime(path)
+    inputs = [os.path.join(folder, name) for name in INPUT_FILES.values()]
+    return all(os.path.getmtime(p) <= built for p in inputs if os.path.exists(p))
+
+def load_graph(folder: str, path: str, rebuild: bool = False) -> LineageGraph:
+    """Map the saved graph when it is newer than every input, otherwise rebuild and save it"""
+    if not rebuild and graph_is_current(folder, path):
+        try:
+            graph = LineageGraph.open(path)
+            print_progress(f"Opened {path} ({graph.node_count} nodes, {graph.edge_count} edges)")
+            return graph
+        except (OSError, ValueError) as e:
+            print(f"[WARN] {path} unreadable ({e}); rebuilding")
+    graph = LineageGraph(build_graph(folder))
+    graph.save(path)
+    print_progress(f"Built {path} ({graph.node_count} nodes, {graph.edge_count} edges)")
+    return graph
+
+# ==============================
+# WRITE CSV
+# ==============================
+
+RESULT_COLUMNS = ["Node_Type", "Node_LUID", "Node_Name", "Hops"]
+
+def write_results(graph: LineageGraph, found: list, path=None) -> int:
+    """Write (index, hops) results as CSV to the path, or to the console"""
+    rows = [(graph.node_type(i), graph.node_id(i), graph.node_name(i), hops) for i, hops in found]
+    if path is None:
+        w = csv.writer(sys.stdout)
+        w.writerow(RESULT_COLUMNS)
+        w.writerows(rows)
+        return len(rows)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(RESULT_COLUMNS)
+        w.writerows(rows)
+    os.replace(tmp, path)
+    return len(rows)
+
+# ==============================
+# MAIN
+# ==============================
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the lineage graph of the Metadata API extracts.")
+    query = parser.add_mutually_exclusive_group()
+    query.add_argument("--downstream", metavar="NODE")
+    query.add_argument("--upstream", metavar="NODE")
+    query.add_argument("--impact", metavar="NODE")
+    parser.add_argument("--depth", type=int, default=None)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    started = time.time()
+    print_progress(f"Started at {datetime.now(timezone.utc).isoformat()}")
+    graph = load_graph(SHARED_FOLDER, GRAPH_PATH, args.rebuild)
+    key = args.downstream or args.upstream or args.impact
+    if key is not None:
+        starts = graph.lookup(key)
+        if not starts:
+            raise ValueError(f"No database, table or content item with id or name {key!r}")
+        print_progress(f"{len(starts)} node(s) match {key!r}")
+        if args.impact is not None:
+            impact = graph.impact(starts, args.depth)
+            for node_type, found in impact.items():
+                print_progress(f"  {node_type}: {len(found)}")
+            found = [entry for entries in impact.values() for entry in entries]
+        else:
+            found = graph.walk(starts, args.upstream is None, args.depth)
+        count = write_results(graph, found, args.output)
+        print_progress(f"{count} {'upstream' if args.upstream is not None else 'downstream'} nodes"
+                       + (f" → {args.output}" if args.output else ""))
+    print(f"[INFO] Duration: {time.time() - started:.2f} seconds")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
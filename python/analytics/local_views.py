@@ -0,0 +1,311 @@
+# ==============================
+# USER VARIABLES (EDIT HERE)
+# ==============================
+
+import os
+
+# Loads the extractor CSVs into an embedded database (DuckDB when installed,
+# otherwise SQLite from the standard library) under the Snowflake table and
+# column names, indexes the LUID columns, and materializes every view in SQL/
+# from the same .sql files Snowflake runs. View logic can then be checked and
+# timed offline, or used directly where there is no Snowflake.
+
+SHARED_FOLDER = "C:/Path/To/Your/Shared/Folder"  # Where the GET scripts write their CSVs
+SQL_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "SQL")  # The create or replace view scripts
+DATABASE_PATH = os.path.join(SHARED_FOLDER, "LOCAL_analytics")  # .duckdb or .sqlite is appended; rebuilt on every run
+TIMINGS_CSV_PATH = os.path.join(SHARED_FOLDER, "LOCAL_analytics_timings.csv")  # Rows and seconds per table and view
+
+ENGINE = "auto"  # "auto" (DuckDB if installed, else SQLite), "duckdb" or "sqlite"
+
+# Snowflake table (TABLEAU.TABLEAU_REST.<name>) loaded from each CSV
+TABLES = {
+    'ITEMS_DATASOURCES': "REST_items_datasources.csv",
+    'ITEMS_FLOWS': "REST_items_flows.csv",
+    'ITEMS_PROJECTS': "REST_items_projects.csv",
+    'ITEMS_VIRTUAL_CONNECTIONS': "REST_items_virtualConnections.csv",
+    'ITEMS_WORKBOOKS': "REST_items_workbooks.csv",
+    'ITEMS_VIEWS': "REST_items_views.csv",
+    'ALL_ITEMS': "REST_all_items.csv",
+    'PROJECT_HIERARCHY': "REST_project_hierarchy.csv",
+    'PROJECT_CLOSURE': "REST_project_closure.csv",
+    'USERS': "REST_users.csv",
+    'GROUPS': "REST_groups.csv",
+    'GROUP_USERS': "REST_group_users.csv",
+    'PERMISSIONS_EXPLICIT': "REST_permissions_explicit.csv",
+    'PERMISSIONS_DEFAULT': "REST_permissions_default.csv",
+    'TAGS_DATASOURCES': "REST_tags_datasources.csv",
+    'TAGS_FLOWS': "REST_tags_flows.csv",
+    'TAGS_WORKBOOKS': "REST_tags_workbooks.csv",
+    'ALL_TAGS': "REST_all_tags.csv",
+    'DB_CONN_DATASOURCES': "REST_db_conn_datasources.csv",
+    'DB_CONN_FLOWS': "REST_db_conn_flows.csv",
+    'DB_CONN_VIRTUAL_CONNECTIONS': "REST_db_conn_virtualConnections.csv",
+    'DB_CONN_WORKBOOKS': "REST_db_conn_workbooks.csv",
+    'DB_CONN_DATASOURCE_DETAILS': "REST_db_connection_datasource_details.csv",
+    'DB_CONN_FLOW_DETAILS': "REST_db_connection_flow_details.csv",
+    'DB_CONN_VIRTUAL_CONNECTION_DETAILS': "REST_db_connection_virtual_connection_details.csv",
+    'DB_CONN_WORKBOOK_DETAILS': "REST_db_connection_workbook_details.csv"
+}
+
+# CSV headers become Snowflake columns by rule ("Owner Id" → Owner_LUID,
+# "CreatedAt" → Created_At, "ContentUrl" → Content_URL); these are the exceptions
+COLUMN_OVERRIDES = {
+    'PERMISSIONS_EXPLICIT': {"Capability": "Capability_Name", "Mode": "Capability_Mode"}
+}
+
+# Command line:
+#   --views VW_ALL_ITEMS ...   only these views (and the views they read)
+#   --engine duckdb|sqlite     override ENGINE
+#   --export                   also write each view as LOCAL_<VIEW>.csv in SHARED_FOLDER
+
+# ==============================
+# LIBRARIES
+# ==============================
+
+import argparse
+import csv
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+
+try:
+    import duckdb  # Optional; SQLite is used without it
+except ImportError:
+    duckdb = None
+
+# ==============================
+# LOGGING
+# ==============================
+
+def print_progress(message: str):
+    print(f"[PROGRESS] {message}", flush=True)
+
+# ==============================
+# TABLES
+# ==============================
+
+_WORDS = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+_WORD_NAMES = {"Id": "LUID", "Luid": "LUID", "Url": "URL", "Db": "Database", "Dbname": "Database_Name"}
+
+def snowflake_column(table: str, header: str) -> str:
+    """'Owner Id' → Owner_LUID, 'AdminInsightsPublishedAt' → Admin_Insights_Published_At"""
+    override = COLUMN_OVERRIDES.get(table, {}).get(header)
+    if override:
+        return override
+    words = [w if w.isupper() else w.capitalize() for w in _WORDS.findall(header)]
+    return "_".join(_WORD_NAMES.get(w, w) for w in words)
+
+def _column_type(values) -> str:
+    """INTEGER, BOOLEAN or TEXT, the narrowest that holds every non-empty value"""
+    kinds = {"INTEGER", "BOOLEAN"}
+    for value in values:
+        if "INTEGER" in kinds and not re.fullmatch(r"-?\d{1,18}", value):
+            kinds.discard("INTEGER")
+        if "BOOLEAN" in kinds and value.lower() not in ("true", "false"):
+            kinds.discard("BOOLEAN")
+        if not kinds:
+            return "TEXT"
+    return "INTEGER" if "INTEGER" in kinds else "BOOLEAN" if kinds else "TEXT"
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def load_table(db, engine: str, table: str, path: str) -> int:
+    """Create and fill one table from its CSV; empty cells load as NULL. Returns the row count."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        headers = next(csv.reader(f), [])
+    columns = [snowflake_column(table, h) for h in headers]
+    if engine == "duckdb":
+        select = ", ".join(f"{_quote(h)} AS {_quote(c)}" for h, c in zip(headers, columns))
+        source = path.replace("'", "''")
+        db.execute(f"CREATE TABLE {_quote(table)} AS SELECT {select} FROM read_csv('{source}', header = true)")
+    else:
+        # Typed columns so numeric comparisons ("Project_Level" <= 9, MAX("Depth")) are not text comparisons
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            found = [[] for _ in headers]
+            for row in reader:
+                for i, value in enumerate(row[:len(headers)]):
+                    if value:
+                        found[i].append(value)
+        types = [_column_type(values) for values in found]
+        del found
+        db.execute(f"CREATE TABLE {_quote(table)} ({', '.join(f'{_quote(c)} {t}' for c, t in zip(columns, types))})")
+        converters = [int if t == "INTEGER" else (lambda v: v.lower() == "true") if t == "BOOLEAN" else str for t in types]
+        width = len(headers)
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            db.executemany(f"INSERT INTO {_quote(table)} VALUES ({', '.join('?' * width)})",
+                           ([convert(v) if v else None for convert, v in zip(converters, row + [""] * (width - len(row)))]
+                            for row in reader))
+    index_luid_columns(db, table, columns)
+    return db.execute(f"SELECT COUNT(*) FROM {_quote(table)}").fetchone()[0]
+
+def index_luid_columns(db, table: str, columns: list):
+    for column in columns:
+        if column.upper() == "LUID" or column.upper().endswith("_LUID"):
+            db.execute(f"CREATE INDEX {_quote(f'IX_{table}_{column}')} ON {_quote(table)} ({_quote(column)})")
+
+# ==============================
+# VIEWS
+# ==============================
+
+_VIEW = re.compile(r"create\s+or\s+replace\s+view\s+([\w.]+)\s*\((.*?)\)\s*as\b(.*)", re.IGNORECASE | re.DOTALL)
+
+def read_views(folder: str) -> dict:
+    """{view name: (column list, select body)} for each create or replace view script"""
+    views = {}
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().startswith("vw_"):
+            continue
+        with open(os.path.join(folder, name), encoding="utf-8") as f:
+            match = _VIEW.match(f.read().strip())
+        if match is None:
+            print(f"[WARN] {name}: no create or replace view statement; skipped")
+            continue
+        view = match.group(1).split(".")[-1].upper()
+        views[view] = ([c.strip() for c in match.group(2).split(",")], match.group(3).strip().rstrip(";"))
+    return views
+
+def view_order(views: dict, wanted=None) -> list:
+    """Views in dependency order; with wanted, just those and the views they read"""
+    order, visiting = [], set()
+    def visit(view):
+        if view in order or view in visiting:
+            return
+        visiting.add(view)
+        for used in re.findall(r"\bVW_\w+", views[view][1], re.IGNORECASE):
+            if used.upper() in views and used.upper() != view:
+                visit(used.upper())
+        order.append(view)
+    for view in wanted or views:
+        if view.upper() not in views:
+            raise ValueError(f"No view {view} in {SQL_FOLDER}")
+        visit(view.upper())
+    return order
+
+def translate(body: str, engine: str) -> str:
+    """Snowflake → local SQL. Tables keep a schema prefix (main.) so a CTE named like a table
+    (users) cannot shadow it, as the fully qualified names do in Snowflake."""
+    body = re.sub(r"\bTABLEAU\.TABLEAU_REST\.", "main.", body, flags=re.IGNORECASE)
+    # Snowflake arrays (VW_PROJECT_HIERARCHY): JSON arrays in SQLite, 1-based lists in DuckDB
+    if engine == "sqlite":
+        body = re.sub(r"\bARRAY_CONSTRUCT\(", "json_array(", body, flags=re.IGNORECASE)
+        body = re.sub(r"\bARRAY_APPEND\(([^,()]+),\s*([^()]+?)\)", r"json_insert(\1, '$[#]', \2)", body, flags=re.IGNORECASE)
+        body = re.sub(r'("[^"]+")\[(\d+)\]', r"json_extract(\1, '$[\2]')", body)
+    else:
+        body = re.sub(r"\bARRAY_CONSTRUCT\(", "list_value(", body, flags=re.IGNORECASE)
+        body = re.sub(r"\bARRAY_APPEND\(", "list_append(", body, flags=re.IGNORECASE)
+        body = re.sub(r'("[^"]+")\[(\d+)\]', lambda m: f"{m.group(1)}[{int(m.group(2)) + 1}]", body)
+    if engine == "sqlite":
+        body = re.sub(r"\bLEFT\(([^,()]+),\s*LEN\(\1\)\s*-\s*(\d+)\)", r"substr(\1, 1, length(\1) - \2)", body, flags=re.IGNORECASE)
+        body = re.sub(r"\bILIKE\b", "LIKE", body, flags=re.IGNORECASE)  # SQLite LIKE is already case-insensitive
+    return body
+
+def materialize_view(db, engine: str, view: str, columns: list, body: str) -> int:
+    """Run the view body once into a table of the same name, so later views read the result"""
+    db.execute(f"CREATE TABLE {_quote(view)} AS WITH _view ({', '.join(columns)}) AS ({translate(body, engine)}) SELECT * FROM _view")
+    index_luid_columns(db, view, [c.strip('"') for c in columns])
+    return db.execute(f"SELECT COUNT(*) FROM {_quote(view)}").fetchone()[0]
+
+def export_view(db, view: str, path: str) -> int:
+    cursor = db.execute(f"SELECT * FROM {_quote(view)}")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    count = 0
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow([d[0] for d in cursor.description])
+        while True:
+            rows = cursor.fetchmany(10000)
+            if not rows:
+                break
+            w.writerows(rows)
+            count += len(rows)
+    os.replace(tmp, path)
+    return count
+
+def write_timings(rows: list, path: str):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["Object", "Kind", "Rows", "Seconds"])
+        w.writerows(rows)
+    os.replace(tmp, path)
+
+# ==============================
+# MAIN
+# ==============================
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialize the SQL/ views locally from the extractor CSVs.")
+    parser.add_argument("--views", nargs="+", default=None)
+    parser.add_argument("--engine", choices=["auto", "duckdb", "sqlite"], default=ENGINE)
+    parser.add_argument("--export", action="store_true")
+    args = parser.parse_args()
+
+    started = time.time()
+    print_progress(f"Started at {datetime.now(timezone.utc).isoformat()}")
+    engine = args.engine if args.engine != "auto" else "duckdb" if duckdb is not None else "sqlite"
+    if engine == "duckdb" and duckdb is None:
+        raise ImportError("duckdb is not installed (pip install duckdb), or use --engine sqlite")
+    db_errors = (sqlite3.Error,) + ((duckdb.Error,) if duckdb is not None else ())
+
+    views = read_views(SQL_FOLDER)
+    order = view_order(views, args.views)
+    path = f"{DATABASE_PATH}.{engine}"
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    if engine == "duckdb":
+        db = duckdb.connect(tmp)
+    else:
+        db = sqlite3.connect(tmp, isolation_level=None)
+        db.execute("PRAGMA journal_mode = OFF")  # Scratch file until it replaces the last one
+        db.execute("PRAGMA synchronous = OFF")
+        db.execute("BEGIN")
+    print_progress(f"Loading {engine} database {path}")
+
+    timings = []
+    for table, file_name in TABLES.items():
+        csv_path = os.path.join(SHARED_FOLDER, file_name)
+        if not os.path.exists(csv_path):
+            print(f"[WARN] {file_name} not found; {table} not loaded")
+            continue
+        t = time.time()
+        count = load_table(db, engine, table, csv_path)
+        timings.append([table, "table", count, round(time.time() - t, 3)])
+        print_progress(f"{table}: {count} rows ({timings[-1][3]}s)")
+
+    failed = []
+    for view in order:
+        columns, body = views[view]
+        t = time.time()
+        try:
+            count = materialize_view(db, engine, view, columns, body)
+        except db_errors as e:
+            print(f"[WARN] {view} not materialized: {e}")
+            failed.append(view)
+            continue
+        timings.append([view, "view", count, round(time.time() - t, 3)])
+        print_progress(f"{view}: {count} rows ({timings[-1][3]}s)")
+        if args.export:
+            export_view(db, view, os.path.join(SHARED_FOLDER, f"LOCAL_{view}.csv"))
+
+    if engine == "sqlite":
+        db.execute("COMMIT")
+    db.close()
+    os.replace(tmp, path)
+    write_timings(timings, TIMINGS_CSV_PATH)
+    print_progress(f"{len(order) - len(failed)} of {len(order)} views materialized → {path}")
+    print(f"[INFO] Duration: {time.time() - started:.2f} seconds")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
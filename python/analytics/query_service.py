@@ -0,0 +1,503 @@
+# ==============================
+# USER VARIABLES (EDIT HERE)
+# ==============================
+
+import os
+
+# Read-only lookups over the latest extractor CSVs, answered from in-memory
+# indexes instead of a Snowflake query: who can see an item, what a user owns,
+# which items use a server, and so on. Serves JSON over HTTP, answers a single
+# path from the command line, and reloads by itself when a new snapshot lands.
+
+SHARED_FOLDER = "C:/Path/To/Your/Shared/Folder"  # Where the GET scripts write their CSVs
+ITEM_FILES = {
+    'project': "REST_items_projects.csv",
+    'datasource': "REST_items_datasources.csv",
+    'flow': "REST_items_flows.csv",
+    'virtualconnection': "REST_items_virtualConnections.csv",
+    'workbook': "REST_items_workbooks.csv"
+}
+TAG_FILES = {
+    'datasource': "REST_tags_datasources.csv",
+    'flow': "REST_tags_flows.csv",
+    'workbook': "REST_tags_workbooks.csv"
+}
+CONNECTION_FILES = {
+    'datasource': "REST_db_conn_datasources.csv",
+    'flow': "REST_db_conn_flows.csv",
+    'virtualconnection': "REST_db_conn_virtualConnections.csv",
+    'workbook': "REST_db_conn_workbooks.csv"
+}
+USERS_FILE = "REST_users.csv"
+GROUPS_FILE = "REST_groups.csv"
+GROUP_USERS_FILE = "REST_group_users.csv"
+
+# HTTP server
+HOST = "127.0.0.1"  # Local only by default; the service has no authentication
+PORT = 8765
+
+# Hot reload: the input files are checked this often, and a new snapshot is
+# loaded once they have stopped changing for one whole interval
+RELOAD_CHECK_SECONDS = 10
+
+# Load benchmark (--benchmark): requests spread over the lookup paths below
+BENCHMARK_REQUESTS = 5000
+BENCHMARK_THREADS = 8
+
+# Paths (GET, JSON responses). <key> is a LUID or an exact, case-insensitive name.
+#   /status
+#   /items/<type>/<key>                    item, tags and connections (type: project, datasource, flow, virtualconnection, workbook)
+#   /items/<type>/<key>/access?capability=Read
+#                                          users the capability resolves to Allow for, with the source (VW_EFFECTIVE_PERMISSIONS rules)
+#   /users/<key>                           user and their groups
+#   /users/<key>/owned                     items the user owns
+#   /groups/<key>/members
+#   /projects/<key>/items
+#   /tags/<tag>/items
+#   /servers/<server name>/items
+
+# ==============================
+# LIBRARIES
+# ==============================
+
+import argparse
+import csv
+import http.client
+import json
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+import effective_permissions
+
+# ==============================
+# LOGGING
+# ==============================
+
+def print_progress(message: str):
+    print(f"[PROGRESS] {message}", flush=True)
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = int(-(-pct * len(sorted_values) // 100))
+    return sorted_values[min(len(sorted_values), max(1, rank)) - 1]
+
+# ==============================
+# LOAD INPUTS
+# ==============================
+
+def _column_key(name: str) -> str:
+    key = re.sub(r"[^a-z0-9]+", "", name.lower())
+    return key[:-4] + "id" if key.endswith("luid") else key
+
+def read_csv(folder: str, file_name: str, columns: dict):
+    """
+    Yield one dict per CSV row with just the requested fields (first matching
+    alias wins); empty cells are None. A missing file reads as empty.
+    """
+    path = os.path.join(folder, file_name)
+    if not os.path.exists(path):
+        print(f"[WARN] {path} not found; treating it as empty")
+        return
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        index = {_column_key(h): i for i, h in enumerate(next(reader, []))}
+        positions = {}
+        for field, aliases in columns.items():
+            found = [index[_column_key(a)] for a in aliases if _column_key(a) in index]
+            positions[field] = found[0] if found else None
+        for row in reader:
+            yield {field: (row[i].strip() or None) if i is not None and i < len(row) else None
+                   for field, i in positions.items()}
+
+def input_files() -> list:
+    return (list(ITEM_FILES.values()) + list(TAG_FILES.values()) + list(CONNECTION_FILES.values())
+            + [USERS_FILE, GROUPS_FILE, GROUP_USERS_FILE]
+            + list(effective_permissions.INPUT_FILES.values()))
+
+def snapshot_signature(folder: str) -> tuple:
+    """(file, mtime, size) of every input present; changes whenever a new extract is written"""
+    signature = []
+    for name in sorted(set(input_files())):
+        try:
+            stat = os.stat(os.path.join(folder, name))
+        except OSError:
+            continue
+        signature.append((name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+# ==============================
+# SNAPSHOT INDEX
+# ==============================
+
+class Snapshot:
+    """
+    One extraction snapshot, indexed by item, user, group, project, tag and
+    connection server. Read-only once built; a reload builds a new one.
+    """
+    def __init__(self, folder: str):
+        started = time.time()
+        self.signature = snapshot_signature(folder)
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+        self.items = {}          # (type, id) -> item
+        self.item_names = {}     # (type, lower name) -> [id]
+        self.by_owner = {}       # user id -> [(type, id)]
+        self.by_project = {}     # project id -> [(type, id)]
+        self.users = {}          # id -> user
+        self.user_names = {}     # lower name or full name -> [id]
+        self.groups = {}         # id -> group
+        self.group_names = {}    # lower name -> [id]
+        self.group_members = {}  # group id -> [user id]
+        self.user_groups = {}    # user id -> [group id]
+        self.tags = {}           # lower tag -> [(type, id)]
+        self.item_tags = {}      # (type, id) -> [tag]
+        self.servers = {}        # lower server name -> [(type, id)]
+        self.connections = {}    # (type, id) -> [connection]
+
+        for item_type, file_name in ITEM_FILES.items():
+            columns = {'id': ["LUID"], 'name': ["Name"], 'owner_id': ["Owner Id", "Owner_LUID"],
+                       'project_id': ["Project Id", "Project_LUID"], 'site_id': ["Site Id", "Site_LUID"],
+                       'parent_id': ["ParentProjectId", "Parent_Project_LUID"]}
+            for row in read_csv(folder, file_name, columns):
+                if not row['id']:
+                    continue
+                key = (item_type, row['id'])
+                self.items[key] = {'type': item_type, 'id': row['id'], 'name': row['name'],
+                                   'projectId': row['parent_id'] if item_type == 'project' else row['project_id'],
+                                   'ownerId': row['owner_id'], 'siteId': row['site_id']}
+                self.item_names.setdefault((item_type, (row['name'] or "").lower()), []).append(row['id'])
+                if row['owner_id']:
+                    self.by_owner.setdefault(row['owner_id'], []).append(key)
+                if self.items[key]['projectId']:
+                    self.by_project.setdefault(self.items[key]['projectId'], []).append(key)
+
+        for row in read_csv(folder, USERS_FILE, {'id': ["LUID"], 'name': ["Name"], 'full_name': ["FullName"],
+                                                 'site_role': ["SiteRole"], 'last_login': ["LastLogin"]}):
+            if row['id']:
+                self.users[row['id']] = {'id': row['id'], 'name': row['name'], 'fullName': row['full_name'],
+                                         'siteRole': row['site_role'], 'lastLogin': row['last_login']}
+                for name in {(row['name'] or "").lower(), (row['full_name'] or "").lower()} - {""}:
+                    self.user_names.setdefault(name, []).append(row['id'])
+        for row in read_csv(folder, GROUPS_FILE, {'id': ["LUID"], 'name': ["Name"]}):
+            if row['id']:
+                self.groups[row['id']] = {'id': row['id'], 'name': row['name']}
+                self.group_names.setdefault((row['name'] or "").lower(), []).append(row['id'])
+        for row in read_csv(folder, GROUP_USERS_FILE, {'group_id': ["Group Id", "Group_LUID"],
+                                                       'user_id': ["User Id", "User_LUID"]}):
+            if row['group_id'] and row['user_id']:
+                self.group_members.setdefault(row['group_id'], []).append(row['user_id'])
+                self.user_groups.setdefault(row['user_id'], []).append(row['group_id'])
+
+        for item_type, file_name in TAG_FILES.items():
+            for row in read_csv(folder, file_name, {'id': ["ItemLUID", "Item_LUID"], 'tag': ["TagLabel", "Tag_Label"]}):
+                if row['id'] and row['tag']:
+                    self.tags.setdefault(row['tag'].lower(), []).append((item_type, row['id']))
+                    self.item_tags.setdefault((item_type, row['id']), []).append(row['tag'])
+        for item_type, file_name in CONNECTION_FILES.items():
+            columns = {'id': ["LUID"], 'connection_id': ["ConnectionId", "Connection_LUID"],
+                       'type': ["ConnectionType"], 'server': ["ServerName"], 'port': ["ServerPort"],
+                       'user_name': ["UserName"], 'database': ["DbName"]}
+            for row in read_csv(folder, file_name, columns):
+                if not row['id']:
+                    continue
+                key = (item_type, row['id'])
+                self.connections.setdefault(key, []).append(
+                    {'id': row['connection_id'], 'type': row['type'], 'server': row['server'], 'port': row['port'],
+                     'userName': row['user_name'], 'database': row['database']})
+                if row['server']:
+                    self.servers.setdefault(row['server'].lower(), []).append(key)
+
+        try:
+            self.permissions = effective_permissions.EffectivePermissions(
+                effective_permissions.PermissionIndex(folder), include_undefined=False, use_numpy=False)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Permissions not indexed ({e}); /access lookups are unavailable")
+            self.permissions = None
+        self.load_seconds = time.time() - started
+
+    # ---- key resolution ----
+
+    def find_items(self, item_type: str, key: str) -> list:
+        if (item_type, key) in self.items:
+            return [(item_type, key)]
+        return [(item_type, i) for i in self.item_names.get((item_type, key.lower()), [])]
+
+    def find_users(self, key: str) -> list:
+        return [key] if key in self.users else list(self.user_names.get(key.lower(), []))
+
+    def find_groups(self, key: str) -> list:
+        return [key] if key in self.groups else list(self.group_names.get(key.lower(), []))
+
+    # ---- responses ----
+
+    def item_summary(self, key: tuple) -> dict:
+        return self.items.get(key) or {'type': key[0], 'id': key[1], 'name': None}
+
+    def user_summary(self, user_id: str) -> dict:
+        return self.users.get(user_id) or {'id': user_id, 'name': None}
+
+    def item_detail(self, key: tuple) -> dict:
+        return dict(self.items[key], tags=self.item_tags.get(key, []), connections=self.connections.get(key, []))
+
+    def access(self, key: tuple, capability: str) -> list:
+        """Users for whom the capability resolves to Allow on the item, with the deciding source"""
+        allowed = []
+        for user_id, code in self.permissions.capability_users(*key, capability):
+            mode, source = effective_permissions.SOURCES[code]
+            if mode == 'Allow':
+                allowed.append(dict(self.user_summary(user_id), source=source))
+        return allowed
+
+    def status(self) -> dict:
+        return {'loadedAt': self.loaded_at, 'loadSeconds': round(self.load_seconds, 3),
+                'items': len(self.items), 'users': len(self.users), 'groups': len(self.groups),
+                'tags': len(self.tags), 'servers': len(self.servers),
+                'permissions': self.permissions is not None,
+                'files': [{'name': name, 'modified': datetime.fromtimestamp(mtime / 1e9, timezone.utc).isoformat(),
+                           'bytes': size} for name, mtime, size in self.signature]}
+
+# ==============================
+# QUERY SERVICE
+# ==============================
+
+class QueryService:
+    """
+    Routes lookup paths to the current snapshot. Each request reads the
+    snapshot reference once, so a reload swapping it in mid-request is safe.
+    """
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.snapshot = Snapshot(folder)
+        self._watcher = None
+        self._stop = threading.Event()
+        print_progress(f"Loaded snapshot in {self.snapshot.load_seconds:.2f}s: {len(self.snapshot.items)} items, "
+                       f"{len(self.snapshot.users)} users")
+
+    def query(self, path: str):
+        """(HTTP status, JSON-able payload) for a lookup path"""
+        snapshot = self.snapshot
+        parts = urlsplit(path)
+        segments = [unquote(s) for s in parts.path.strip("/").split("/") if s]
+        params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+
+        if segments == ['status']:
+            return 200, snapshot.status()
+        if len(segments) in (3, 4) and segments[0] == 'items':
+            item_type, key = segments[1].lower(), segments[2]
+            if item_type not in ITEM_FILES:
+                return 400, {'error': f"Unknown item type {segments[1]!r}; expected one of {', '.join(ITEM_FILES)}"}
+            found = snapshot.find_items(item_type, key)
+            if not found:
+                return 404, {'error': f"No {item_type} {key!r}"}
+            if len(segments) == 3:
+                return 200, {'items': [snapshot.item_detail(k) for k in found]}
+            if segments[3] == 'access':
+                if snapshot.permissions is None:
+                    return 503, {'error': "Permissions are not indexed in this snapshot"}
+                capability = params.get('capability', 'Read')
+                return 200, {'capability': capability,
+                             'items': [dict(snapshot.item_summary(k), users=snapshot.access(k, capability)) for k in found]}
+        if len(segments) in (2, 3) and segments[0] == 'users':
+            found = snapshot.find_users(segments[1])
+            if not found:
+                return 404, {'error': f"No user {segments[1]!r}"}
+            if len(segments) == 2:
+                return 200, {'users': [dict(snapshot.user_summary(u), groups=[snapshot.groups.get(g, {'id': g})
+                                                                              for g in snapshot.user_groups.get(u, [])])
+                                       for u in found]}
+            if segments[2] == 'owned':
+                return 200, {'users': [dict(snapshot.user_summary(u), owned=[snapshot.item_summary(k) for k in snapshot.by_owner.get(u, [])])
+                                       for u in found]}
+        if len(segments) == 3 and segments[0] == 'groups' and segments[2] == 'members':
+            found = snapshot.find_groups(segments[1])
+            if not found:
+                return 404, {'error': f"No group {segments[1]!r}"}
+            return 200, {'groups': [dict(snapshot.groups.get(g, {'id': g}),
+                                         members=[snapshot.user_summary(u) for u in snapshot.group_members.get(g, [])])
+                                    for g in found]}
+        if len(segments) == 3 and segments[0] == 'projects' and segments[2] == 'items':
+            found = snapshot.find_items('project', segments[1])
+            if not found:
+                return 404, {'error': f"No project {segments[1]!r}"}
+            return 200, {'projects': [dict(snapshot.item_summary(k), items=[snapshot.item_summary(i) for i in snapshot.by_project.get(k[1], [])])
+                                      for k in found]}
+        if len(segments) == 3 and segments[0] in ('tags', 'servers') and segments[2] == 'items':
+            index = snapshot.tags if segments[0] == 'tags' else snapshot.servers
+            keys = list(dict.fromkeys(index.get(segments[1].lower(), [])))
+            return 200, {segments[0][:-1]: segments[1], 'items': [snapshot.item_summary(k) for k in keys]}
+        return 404, {'error': f"Unknown path {parts.path!r}"}
+
+    # ---- hot reload ----
+
+    def watch(self, interval: float = RELOAD_CHECK_SECONDS):
+        """Reload in the background once a changed set of input files has been stable for one interval"""
+        def loop():
+            pending = None
+            while not self._stop.wait(interval):
+                signature = snapshot_signature(self.folder)
+                if signature == self.snapshot.signature:
+                    pending = None
+                elif signature != pending:
+                    pending = signature  # Still being written; check again next interval
+                else:
+                    self.reload()
+                    pending = None
+        self._watcher = threading.Thread(target=loop, daemon=True)
+        self._watcher.start()
+
+    def reload(self):
+        try:
+            snapshot = Snapshot(self.folder)
+        except Exception as e:
+            print(f"[WARN] Reload failed ({e}); still serving the snapshot loaded at {self.snapshot.loaded_at}")
+            return
+        self.snapshot = snapshot
+        print_progress(f"Reloaded snapshot in {snapshot.load_seconds:.2f}s: {len(snapshot.items)} items, "
+                       f"{len(snapshot.users)} users")
+
+    def stop(self):
+        self._stop.set()
+
+# ==============================
+# HTTP SERVER
+# ==============================
+
+def start_server(service: QueryService, host: str, port: int) -> ThreadingHTTPServer:
+    class QueryHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, so clients can reuse one connection
+        disable_nagle_algorithm = True  # Headers and body go out as separate writes; don't hold the body back
+
+        def do_GET(self):
+            try:
+                status, payload = service.query(self.path)
+            except Exception as e:
+                status, payload = 500, {'error': str(e)}
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# ==============================
+# LOAD BENCHMARK
+# ==============================
+
+def benchmark_paths(snapshot: Snapshot, count: int) -> list:
+    """(kind, path) pairs drawn at random from the snapshot's own keys"""
+    rnd = random.Random(0)
+    pools = {
+        'item': [f"/items/{t}/{quote(i)}" for t, i in snapshot.items],
+        'access': [f"/items/{t}/{quote(i)}/access" for t, i in snapshot.items if t != 'project'] if snapshot.permissions else [],
+        'user': [f"/users/{quote(u)}" for u in snapshot.users],
+        'owned': [f"/users/{quote(u)}/owned" for u in snapshot.users],
+        'members': [f"/groups/{quote(g)}/members" for g in snapshot.groups],
+        'project': [f"/projects/{quote(i)}/items" for t, i in snapshot.items if t == 'project'],
+        'tag': [f"/tags/{quote(t)}/items" for t in snapshot.tags],
+        'server': [f"/servers/{quote(s)}/items" for s in snapshot.servers]
+    }
+    kinds = [kind for kind, pool in pools.items() if pool]
+    return [(kind, rnd.choice(pools[kind])) for kind in (rnd.choice(kinds) for _ in range(count))]
+
+def run_benchmark(service: QueryService, requests: int, threads: int):
+    server = start_server(service, "127.0.0.1", 0)
+    port = server.server_address[1]
+    paths = benchmark_paths(service.snapshot, requests)
+    latencies = {}
+    errors = []
+    lock = threading.Lock()
+
+    def worker(chunk):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        local = []
+        for kind, path in chunk:
+            started = time.perf_counter()
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            local.append((kind, time.perf_counter() - started))
+            if response.status != 200:
+                errors.append((path, response.status))
+        connection.close()
+        with lock:
+            for kind, seconds in local:
+                latencies.setdefault(kind, []).append(seconds * 1000)
+
+    print_progress(f"Benchmark: {len(paths)} requests over {threads} connections")
+    started = time.time()
+    workers = [threading.Thread(target=worker, args=(paths[n::threads],)) for n in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.time() - started
+    server.shutdown()
+
+    every = sorted(ms for values in latencies.values() for ms in values)
+    print(f"[INFO] {len(every)} requests in {elapsed:.2f}s ({len(every) / elapsed:.0f} req/s), "
+          f"p50 {percentile(every, 50):.2f} ms, p95 {percentile(every, 95):.2f} ms, p99 {percentile(every, 99):.2f} ms, "
+          f"{len(errors)} non-200")
+    for kind in sorted(latencies):
+        values = sorted(latencies[kind])
+        print(f"[INFO]   {kind}: {len(values)} requests, p50 {percentile(values, 50):.2f} ms, "
+              f"p95 {percentile(values, 95):.2f} ms, max {values[-1]:.2f} ms")
+
+# ==============================
+# MAIN
+# ==============================
+
+def main():
+    parser = argparse.ArgumentParser(description="Local read-only query service over the latest extractor CSVs.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--query", metavar="PATH", help='Answer one path and exit, e.g. "/users/jdoe/owned"')
+    mode.add_argument("--benchmark", action="store_true", help="Run the load benchmark and exit")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--requests", type=int, default=BENCHMARK_REQUESTS)
+    parser.add_argument("--threads", type=int, default=BENCHMARK_THREADS)
+    args = parser.parse_args()
+
+    service = QueryService(SHARED_FOLDER)
+    if args.query:
+        status, payload = service.query(args.query)
+        print(json.dumps(payload, indent=2))
+        if status != 200:
+            sys.exit(1)
+        return
+    if args.benchmark:
+        run_benchmark(service, args.requests, args.threads)
+        return
+
+    server = start_server(service, args.host, args.port)
+    service.watch()
+    print_progress(f"Serving http://{args.host}:{server.server_address[1]}/status (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.shutdown()
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
@@ -0,0 +1,278 @@
+# ==============================
+# USER VARIABLES (EDIT HERE)
+# ==============================
+
+import os
+
+# Compares this run's extractor CSVs with the previous run's by each file's
+# natural key and writes only the added, removed and changed rows, so
+# Snowflake can load (MERGE) the deltas instead of diffing full tables.
+# Rows are spread over hash partitions on disk first, so only one partition
+# of one file is held in memory at a time, whatever the file size.
+
+SHARED_FOLDER = "C:/Path/To/Your/Shared/Folder"  # Where the GET scripts write their CSVs
+SNAPSHOT_FOLDER = os.path.join(SHARED_FOLDER, "snapshot_previous")  # Copy of the last run's CSVs, replaced after each diff
+DELTA_FOLDER = os.path.join(SHARED_FOLDER, "delta")  # DELTA_<file>.csv per input plus DELTA_summary.csv
+
+FILE_PATTERNS = ["REST_*.csv", "LOCAL_effective_permissions.csv"]  # Files compared, in either snapshot
+
+# Natural key columns by file pattern (first match wins). Files with no entry,
+# or missing a key column, are keyed on the whole row: only adds and removes.
+NATURAL_KEYS = {
+    "REST_items_*.csv": ["LUID"],
+    "REST_all_items.csv": ["Item_LUID"],
+    "REST_all_tags.csv": ["Item_LUID", "Tag_Label"],
+    "REST_users.csv": ["LUID"],
+    "REST_groups.csv": ["LUID"],
+    "REST_sites.csv": ["LUID"],
+    "REST_subscriptions.csv": ["LUID"],
+    "REST_group_users.csv": ["Group Id", "User Id"],
+    "REST_permissions_explicit.csv": ["Content Type", "Content Id", "Grantee Type", "Grantee Id", "Capability"],
+    "REST_permissions_default.csv": ["Project Id", "GranteeType", "Grantee Id", "ContentType", "CapabilityName"],
+    "REST_tags_*.csv": ["ItemLUID", "TagLabel"],
+    "REST_db_conn_*.csv": ["LUID", "ConnectionId"],
+    "REST_personal_access_tokens.csv": ["TokenGuid"],
+    "REST_user_workbook_visibility.csv": ["Workbook Id", "User Id"],
+    "REST_project_hierarchy.csv": ["LUID"],
+    "REST_project_closure.csv": ["AncestorProjectId", "DescendantProjectId"],
+    "REST_db_connection_lineage_tables.csv": ["Table Id"],
+    "REST_db_connection_lineage_databases.csv": ["Database Id"],
+    "REST_db_connection_datasource_details.csv": ["Datasource Id", "Table Id"],
+    "REST_db_connection_flow_details.csv": ["Flow Id", "Table Id"],
+    "REST_db_connection_virtual_connection_details.csv": ["Virtual Connection Id", "Table Id"],
+    "REST_db_connection_workbook_details.csv": ["Workbook Id", "Table Id"],
+    "LOCAL_effective_permissions.csv": ["Item_Type", "Item_LUID", "User_LUID", "Capability_Name"]
+}
+
+# Columns that change on every run and never make a row count as changed
+IGNORE_COLUMNS = ["AdminInsightsPublishedAt", "Admin_Insights_Published_At"]
+
+# Source bytes per partition; files up to this size are diffed in memory without spilling.
+# Peak memory is roughly 8x this (one partition of previous rows held as Python lists).
+PARTITION_BYTES = 64 * 1024 * 1024
+
+# ==============================
+# LIBRARIES
+# ==============================
+
+import argparse
+import csv
+import fnmatch
+import math
+import operator
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# ==============================
+# LOGGING
+# ==============================
+
+def print_progress(message: str):
+    print(f"[PROGRESS] {message}", flush=True)
+
+# ==============================
+# SNAPSHOT FILES
+# ==============================
+
+def snapshot_files(*folders) -> list:
+    """Names matching FILE_PATTERNS in any of the folders, sorted"""
+    names = set()
+    for folder in folders:
+        if os.path.isdir(folder):
+            names.update(n for n in os.listdir(folder) if any(fnmatch.fnmatch(n, p) for p in FILE_PATTERNS))
+    return sorted(names)
+
+def natural_key(file_name: str):
+    for pattern, columns in NATURAL_KEYS.items():
+        if fnmatch.fnmatch(file_name, pattern):
+            return columns
+    return None
+
+def read_header(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), [])
+
+def read_rows(path: str, header: list):
+    """Rows of a CSV realigned to the given header by column name; absent columns read as ''"""
+    if not os.path.exists(path):
+        return
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        own_header = next(reader, [])
+        if own_header == header:
+            width = len(header)
+            for row in reader:
+                yield row if len(row) >= width else row + [""] * (width - len(row))
+            return
+        own = {name: i for i, name in enumerate(own_header)}
+        positions = [own.get(name) for name in header]
+        for row in reader:
+            yield [row[i] if i is not None and i < len(row) else "" for i in positions]
+
+def stage_snapshot(folder: str) -> str:
+    """Copy this run's CSVs aside; the diff reads the copy, which then becomes the previous snapshot"""
+    staged = f"{SNAPSHOT_FOLDER}.staged"
+    shutil.rmtree(staged, ignore_errors=True)
+    os.makedirs(staged)
+    for name in snapshot_files(folder):
+        shutil.copy2(os.path.join(folder, name), os.path.join(staged, name))
+    return staged
+
+def promote_snapshot(staged: str):
+    shutil.rmtree(SNAPSHOT_FOLDER, ignore_errors=True)
+    os.replace(staged, SNAPSHOT_FOLDER)
+
+# ==============================
+# DIFF
+# ==============================
+
+DELTA_COLUMNS = ["Change_Type", "Changed_Columns"]
+SUMMARY_COLUMNS = ["File", "Key_Columns", "Partitions", "Previous_Rows", "Current_Rows",
+                   "Added", "Removed", "Changed", "Unchanged", "Seconds"]
+
+def _partition(rows, get_key, count: int, folder: str, side: str) -> list:
+    """Spill rows to count CSV files by key hash; rows sharing a key land in one file, in order.
+    hash() is salted per process, which is fine: both sides are split within one run."""
+    paths = [os.path.join(folder, f"{side}_{n}.csv") for n in range(count)]
+    files = [open(p, "w", newline="", encoding="utf-8") for p in paths]
+    try:
+        write = [csv.writer(f).writerow for f in files]
+        for row in rows:
+            write[hash(get_key(row)) % count](row)
+    finally:
+        for f in files:
+            f.close()
+    return paths
+
+def _spilled_rows(path: str):
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.reader(f)
+
+def _keyed(rows, get_key):
+    """(key, row) pairs; a repeated key becomes (key, occurrence), so duplicates pair up in order"""
+    seen = {}
+    for row in rows:
+        key = get_key(row)
+        n = seen.get(key)
+        if n is None:
+            seen[key] = 1
+        else:
+            seen[key] = n + 1
+            key = (key, n)
+        yield key, row
+
+def diff_file(name: str, previous_folder: str, current_folder: str, delta_folder: str, partitions=None) -> dict:
+    """Diff one file between two snapshot folders and write DELTA_<name>; returns its summary row"""
+    started = time.time()
+    previous_path = os.path.join(previous_folder, name)
+    current_path = os.path.join(current_folder, name)
+    previous_header, current_header = read_header(previous_path), read_header(current_path)
+    header = current_header or previous_header
+    if previous_header and current_header and set(previous_header) != set(current_header):
+        print(f"[WARN] {name}: columns differ between snapshots; comparing on the current columns")
+    compare = [i for i, column in enumerate(header) if column not in IGNORE_COLUMNS]
+    key_columns = natural_key(name)
+    present = [h for h in (previous_header, current_header) if h]
+    if key_columns and not all(column in h for h in present for column in key_columns):
+        print(f"[WARN] {name}: key column(s) {key_columns} missing; keying on the whole row")
+        key_columns = None
+    # itemgetter keeps the per-row key and comparison work in C; lambda covers files with no columns
+    get_key = operator.itemgetter(*[header.index(c) for c in key_columns] if key_columns else compare) \
+        if header else (lambda row: ())
+    get_compared = operator.itemgetter(*compare) if compare else (lambda row: ())
+
+    sizes = [os.path.getsize(p) for p in (previous_path, current_path) if os.path.exists(p)]
+    count = partitions or max(1, math.ceil(max(sizes, default=0) / PARTITION_BYTES))
+    summary = {"File": name, "Key_Columns": ";".join(key_columns) if key_columns else "(whole row)",
+               "Partitions": count, "Previous_Rows": 0, "Current_Rows": 0,
+               "Added": 0, "Removed": 0, "Changed": 0, "Unchanged": 0}
+
+    os.makedirs(delta_folder, exist_ok=True)
+    delta_path = os.path.join(delta_folder, f"DELTA_{name}")
+    tmp = f"{delta_path}.{os.getpid()}.tmp"
+    with tempfile.TemporaryDirectory(dir=delta_folder) as spill, \
+            open(tmp, "w", newline="", encoding="utf-8") as out:
+        w = csv.writer(out)
+        w.writerow(DELTA_COLUMNS + header)
+        if count == 1:
+            pairs = [(read_rows(previous_path, header), read_rows(current_path, header))]
+        else:
+            previous_parts = _partition(read_rows(previous_path, header), get_key, count, spill, "previous")
+            current_parts = _partition(read_rows(current_path, header), get_key, count, spill, "current")
+            pairs = [(_spilled_rows(p), _spilled_rows(c)) for p, c in zip(previous_parts, current_parts)]
+
+        for previous_rows, current_rows in pairs:
+            previous = dict(_keyed(previous_rows, get_key))
+            summary["Previous_Rows"] += len(previous)
+            for key, row in _keyed(current_rows, get_key):
+                summary["Current_Rows"] += 1
+                old = previous.pop(key, None)
+                if old is None:
+                    summary["Added"] += 1
+                    w.writerow(["Added", ""] + row)
+                    continue
+                if get_compared(old) == get_compared(row):
+                    summary["Unchanged"] += 1
+                    continue
+                summary["Changed"] += 1
+                changed = [header[i] for i in compare if old[i] != row[i]]
+                w.writerow(["Changed", ";".join(changed)] + row)
+            for old in previous.values():
+                summary["Removed"] += 1
+                w.writerow(["Removed", ""] + old)
+    os.replace(tmp, delta_path)
+    summary["Seconds"] = round(time.time() - started, 3)
+    return summary
+
+def write_summary(rows: list, path: str):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+        w.writeheader()
+        w.writerows(rows)
+    os.replace(tmp, path)
+
+# ==============================
+# MAIN
+# ==============================
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two snapshots of the extractor CSVs by natural key.")
+    parser.add_argument("--previous", help="Previous snapshot folder (default: the saved copy of the last run)")
+    parser.add_argument("--current", help="Current snapshot folder (default: SHARED_FOLDER, saved as the next run's previous)")
+    parser.add_argument("--output", default=DELTA_FOLDER)
+    parser.add_argument("--files", nargs="+", help="Only these file names")
+    parser.add_argument("--partitions", type=int, help="Hash partitions per file (default: by file size)")
+    args = parser.parse_args()
+
+    started = time.time()
+    print_progress(f"Started at {datetime.now(timezone.utc).isoformat()}")
+    rolling = args.previous is None and args.current is None
+    previous = args.previous or SNAPSHOT_FOLDER
+    current = args.current or (stage_snapshot(SHARED_FOLDER) if rolling else SHARED_FOLDER)
+    if not os.path.isdir(previous):
+        print_progress(f"No previous snapshot in {previous}; every row counts as added")
+
+    summaries = []
+    for name in args.files or snapshot_files(previous, current):
+        summary = diff_file(name, previous, current, args.output, args.partitions)
+        summaries.append(summary)
+        print_progress(f"{name}: +{summary['Added']} -{summary['Removed']} ~{summary['Changed']} "
+                       f"({summary['Unchanged']} unchanged, {summary['Partitions']} partition(s), {summary['Seconds']}s)")
+    write_summary(summaries, os.path.join(args.output, "DELTA_summary.csv"))
+    if rolling:
+        promote_snapshot(current)
+    print_progress(f"Wrote {len(summaries)} delta files → {args.output}")
+    print(f"[INFO] Duration: {time.time() - started:.2f} seconds")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
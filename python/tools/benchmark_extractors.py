@@ -0,0 +1,365 @@
+# ==============================
+# USER VARIABLES (EDIT HERE)
+# ==============================
+
+import os
+
+# Runs every "GET *.py" extractor against tools/mock_tableau_server.py at each
+# site size and writes one JSON document of throughput, per-stage time and
+# peak RSS. Keep the JSON from a known-good commit and pass it as BASELINE_FILE
+# (or --baseline) to flag regressions.
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_DIR = os.path.dirname(TOOLS_DIR)          # Folder containing the GET scripts
+MOCK_SERVER_SCRIPT = os.path.join(TOOLS_DIR, "mock_tableau_server.py")
+
+SITE_SIZES = [100, 1000]    # Items per synthetic site; each size gets a fresh mock server
+SELECTED_EXTRACTORS = []    # e.g. ["GET users.py"]; empty = every "GET *.py" script
+MOCK_SERVER_ARGS = []       # Extra mock flags, e.g. ["--latency-ms", "20", "--throttle-rate", "0.01"]
+EXTRACTOR_TIMEOUT_SECONDS = 1800
+
+# Rate limiter used by the extractors while benchmarking. The mock has no quota,
+# so the production ceilings would only measure the limiter; None keeps them.
+BENCHMARK_RATE_LIMIT_REQUESTS_PER_SECOND = 10000
+BENCHMARK_RATE_LIMIT_MAX_CONCURRENCY = 8
+
+# Output
+RESULTS_FILE = os.path.join(TOOLS_DIR, "benchmark_results.json")
+WORK_FOLDER = os.path.join(TOOLS_DIR, "benchmark_output")   # Extractor CSVs land here and are overwritten each run
+BASELINE_FILE = None            # Previous RESULTS_FILE to compare against
+REGRESSION_THRESHOLD = 0.10     # Flag rows/sec drops bigger than this fraction
+
+# ==============================
+# LIBRARIES
+# ==============================
+
+import argparse
+import importlib.util
+import json
+import platform
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+try:
+    import resource  # Unix only; peak RSS is reported as null elsewhere
+except ImportError:
+    resource = None
+
+# ==============================
+# LOGGING
+# ==============================
+
+def print_progress(message: str):
+    print(f"[PROGRESS] {message}", flush=True)
+
+# ==============================
+# STAGE TIMERS
+# ==============================
+
+class StageTimers:
+    """
+    Seconds spent per stage, summed over every thread. Nested calls into the
+    same stage (e.g. recursive flatten_xml_element) are only timed once.
+    """
+
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def wrap(self, stage: str, func):
+        def timed(*args, **kwargs):
+            depth = getattr(self._local, stage, 0)
+            setattr(self._local, stage, depth + 1)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                setattr(self._local, stage, depth)
+                if depth == 0:
+                    elapsed = time.perf_counter() - start
+                    with self._lock:
+                        self.seconds[stage] = self.seconds.get(stage, 0.0) + elapsed
+                        self.calls[stage] = self.calls.get(stage, 0) + 1
+        timed.__wrapped__ = func
+        return timed
+
+class _Proxy:
+    """Module stand-in that times selected attributes and passes the rest through."""
+
+    def __init__(self, target, overrides: dict):
+        self._target = target
+        self.__dict__.update(overrides)
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+# ==============================
+# WORKER (one extractor, own process)
+# ==============================
+
+def load_script(path: str):
+    module_name = "bench_" + re.sub(r"[^A-Za-z0-9]+", "_", os.path.basename(path))
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def instrument(module, timers: StageTimers, counters: dict):
+    """Wrap the network, XML parse, flatten and CSV write points of a loaded extractor."""
+    module.requests = _Proxy(module.requests, {'request': timers.wrap('network', module.requests.request)})
+    module.ET = _Proxy(module.ET, {'fromstring': timers.wrap('xmlParse', module.ET.fromstring)})
+    for name, value in list(vars(module).items()):
+        if callable(value) and (name.startswith('flatten_') or name in ('extract_connection_attributes', 'parse_site')):
+            setattr(module, name, timers.wrap('flatten', value))
+
+    write_csv = module.write_csv
+    def counted_write_csv(rows, *args, **kwargs):
+        counters['rows'] += len(rows or [])
+        counters['csvFiles'] += 1
+        return write_csv(rows, *args, **kwargs)
+    module.write_csv = timers.wrap('csvWrite', counted_write_csv)
+
+    api_request = module.api_request
+    def counted_api_request(*args, **kwargs):
+        counters['apiCalls'] += 1
+        return api_request(*args, **kwargs)
+    module.api_request = counted_api_request
+
+def run_worker(script_path: str, server_url: str, out_dir: str, result_path: str):
+    module = load_script(script_path)
+    module.SERVER_URL = server_url
+    module.TOKEN_NAME = module.TOKEN_NAME or "benchmark"
+    module.TOKEN_SECRET = module.TOKEN_SECRET or "benchmark"
+
+    # Re-root outputs (and checkpoints) so a benchmark never touches real folders
+    old_folder = getattr(module, "SHARED_FOLDER", None)
+    if old_folder is not None:
+        for name, value in list(vars(module).items()):
+            if name.endswith("_PATH") and isinstance(value, str) and value.startswith(old_folder):
+                setattr(module, name, os.path.join(out_dir, os.path.relpath(value, old_folder)))
+        module.SHARED_FOLDER = out_dir
+    if hasattr(module, "CHECKPOINT_DIR"):
+        module.CHECKPOINT_DIR = os.path.join(out_dir, "checkpoints")
+    if BENCHMARK_RATE_LIMIT_REQUESTS_PER_SECOND is not None and hasattr(module, "AdaptiveRateLimiter"):
+        module._RATE_LIMITER = module.AdaptiveRateLimiter(BENCHMARK_RATE_LIMIT_REQUESTS_PER_SECOND,
+                                                          BENCHMARK_RATE_LIMIT_MAX_CONCURRENCY)
+
+    timers = StageTimers()
+    counters = {'rows': 0, 'csvFiles': 0, 'apiCalls': 0}
+    instrument(module, timers, counters)
+
+    status, error = "ok", None
+    start = time.perf_counter()
+    try:
+        module.main()
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            status, error = "failed", f"exit code {e.code}"
+    except Exception as e:
+        status, error = "failed", f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - start
+
+    limiter = getattr(module, "_RATE_LIMITER", None)
+    stages = {stage: round(timers.seconds.get(stage, 0.0), 6) for stage in ('network', 'xmlParse', 'flatten', 'csvWrite')}
+    result = {
+        'status': status,
+        'error': error,
+        'wallSeconds': round(wall, 6),
+        'rows': counters['rows'],
+        'csvFiles': counters['csvFiles'],
+        'apiCalls': counters['apiCalls'],
+        'httpRequests': timers.calls.get('network', 0),
+        'stageSeconds': stages,
+        'stageCalls': {stage: timers.calls.get(stage, 0) for stage in stages},
+        'rateLimiterWaitSeconds': round(limiter.wait_seconds, 6) if limiter is not None else None,
+        'throttledResponses': limiter.throttled_count if limiter is not None else None,
+        'peakRssBytes': peak_rss_bytes()
+    }
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+# ==============================
+# MOCK SERVER
+# ==============================
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_mock_server(items: int, extra_args: list):
+    """Run the mock in its own process so it does not share the extractor's GIL."""
+    port = free_port()
+    cmd = [sys.executable, MOCK_SERVER_SCRIPT, "--port", str(port), "--items", str(items)] + list(extra_args)
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Mock server exited with code {proc.returncode}")
+        try:
+            requests.get(f"{url}/__mock/stats", timeout=1)
+            return proc, url
+        except requests.RequestException:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("Mock server did not start within 30 seconds")
+
+def stop_mock_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+# ==============================
+# BENCHMARK
+# ==============================
+
+def selected_extractors():
+    if SELECTED_EXTRACTORS:
+        return list(SELECTED_EXTRACTORS)
+    return sorted(f for f in os.listdir(SCRIPT_DIR) if f.startswith("GET ") and f.endswith(".py"))
+
+def run_extractor(script: str, items: int, server_url: str) -> dict:
+    out_dir = os.path.join(WORK_FOLDER, str(items), os.path.splitext(script)[0])
+    os.makedirs(out_dir, exist_ok=True)
+    requests.post(f"{server_url}/__mock/stats/reset", timeout=5)
+
+    fd, result_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", os.path.join(SCRIPT_DIR, script),
+           "--server-url", server_url, "--out-dir", out_dir, "--result", result_path]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=EXTRACTOR_TIMEOUT_SECONDS)
+        with open(result_path, encoding="utf-8") as f:
+            text = f.read()
+        result = json.loads(text) if text else {'status': 'failed', 'error': f"worker exit code {proc.returncode}"}
+        if result['status'] != 'ok':
+            result['outputTail'] = (proc.stdout + proc.stderr)[-2000:]
+    except subprocess.TimeoutExpired:
+        result = {'status': 'timeout', 'error': f"exceeded {EXTRACTOR_TIMEOUT_SECONDS}s"}
+    finally:
+        os.remove(result_path)
+
+    result['script'] = script
+    result['items'] = items
+    result['server'] = requests.get(f"{server_url}/__mock/stats", timeout=5).json()
+    wall = result.get('wallSeconds') or 0
+    if wall:
+        result['requestsPerSecond'] = round(result.get('httpRequests', 0) / wall, 3)
+        result['rowsPerSecond'] = round(result.get('rows', 0) / wall, 3)
+        stages = result.get('stageSeconds', {})
+        result['stageSeconds']['other'] = round(max(0.0, wall - sum(stages.values())), 6)
+    return result
+
+def compare_to_baseline(results: list, baseline_path: str) -> list:
+    """Rows/sec regressions against a previous results file, worst first."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r['script'], r['items']): r for r in json.load(f).get('results', [])}
+    regressions = []
+    for r in results:
+        old = baseline.get((r['script'], r['items']))
+        if not old or not old.get('rowsPerSecond') or not r.get('rowsPerSecond'):
+            continue
+        change = r['rowsPerSecond'] / old['rowsPerSecond'] - 1.0
+        if change < -REGRESSION_THRESHOLD:
+            regressions.append({'script': r['script'], 'items': r['items'], 'baselineRowsPerSecond': old['rowsPerSecond'],
+                                'rowsPerSecond': r['rowsPerSecond'], 'change': round(change, 4)})
+    return sorted(regressions, key=lambda x: x['change'])
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=SCRIPT_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+# ==============================
+# MAIN
+# ==============================
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the GET extractors against the local mock server.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SITE_SIZES)
+    parser.add_argument("--scripts", nargs="+", default=None, help='e.g. "GET users.py"')
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--mock-arg", action="append", default=list(MOCK_SERVER_ARGS),
+                        help="extra mock server flag, repeatable (e.g. --mock-arg=--latency-ms=20)")
+    # Internal: run a single extractor and write its measurements
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--server-url", help=argparse.SUPPRESS)
+    parser.add_argument("--out-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.server_url, args.out_dir, args.result)
+        return
+
+    scripts = args.scripts or selected_extractors()
+    started = datetime.now(timezone.utc).isoformat()
+    results = []
+    for items in args.sizes:
+        print_progress(f"Starting mock server with {items} items per site")
+        proc, url = start_mock_server(items, args.mock_arg)
+        try:
+            for script in scripts:
+                result = run_extractor(script, items, url)
+                results.append(result)
+                if result['status'] == 'ok':
+                    print_progress(f"{items:>8} items  {script:<45} {result['wallSeconds']:8.2f}s  "
+                                   f"{result['requestsPerSecond']:9.1f} req/s  {result['rowsPerSecond']:10.1f} rows/s")
+                else:
+                    print(f"[WARN] {script} at {items} items: {result['status']} ({result.get('error')})")
+        finally:
+            stop_mock_server(proc)
+
+    document = {
+        'startedAt': started,
+        'finishedAt': datetime.now(timezone.utc).isoformat(),
+        'gitCommit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sizes': args.sizes,
+        'mockServerArgs': args.mock_arg,
+        'rateLimit': {'requestsPerSecond': BENCHMARK_RATE_LIMIT_REQUESTS_PER_SECOND,
+                      'maxConcurrency': BENCHMARK_RATE_LIMIT_MAX_CONCURRENCY},
+        'results': results
+    }
+    if args.baseline:
+        document['regressions'] = compare_to_baseline(results, args.baseline)
+        for r in document['regressions']:
+            print(f"[WARN] Regression: {r['script']} at {r['items']} items "
+                  f"{r['baselineRowsPerSecond']:.1f} -> {r['rowsPerSecond']:.1f} rows/s ({r['change']:+.1%})")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    print_progress(f"Results written to {args.output}")
+    if any(r['status'] != 'ok' for r in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
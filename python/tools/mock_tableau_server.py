@@ -0,0 +1,1015 @@
+# ==============================
+# USER VARIABLES (EDIT HERE)
+# ==============================
+
+# Local stand-in for the Tableau REST + Metadata APIs used by the GET scripts.
+# Point an extractor's SERVER_URL at http://127.0.0.1:<PORT> (any TOKEN_NAME /
+# TOKEN_SECRET / SITE_CONTENT_URL is accepted) to run it with no network.
+# Every value below can also be overridden on the command line (--help).
+
+HOST = "127.0.0.1"
+PORT = 8765
+
+# Synthetic site shape
+SITE_COUNT = 1              # Sites returned by /sites; content URLs are '' (Default), 'site1', 'site2', ...
+ITEMS_PER_SITE = 1000       # Content items per site (workbooks + views + datasources + flows + virtual connections), 10 to 1,000,000
+SEED = 0                    # Changes every generated name/timestamp/relationship while keeping the site shape
+EPOCH = 0                   # Bump to simulate the site changing between runs (updatedAt, preview images)
+CHURN_PERCENT = 5.0         # Share of items touched per epoch
+
+# Server behaviour
+LATENCY_MS = 0.0            # Added to every response
+JITTER_MS = 0.0             # Uniform random extra latency on top of LATENCY_MS
+MAX_REQUESTS_PER_SECOND = 0 # Token bucket; requests over the limit get HTTP 429 (0 = unlimited)
+THROTTLE_RATE = 0.0         # Probability of a random HTTP 429 on any request
+ERROR_RATE = 0.0            # Probability of a random HTTP 500 on any request
+RETRY_AFTER_SECONDS = 1     # Retry-After header sent with injected 429s
+DEFAULT_PAGE_SIZE = 100     # pageSize used when the request omits it (Tableau default)
+PAGE_SIZE_CAP = 1000        # Largest pageSize honoured (Tableau limit)
+PAGE_SIZE_OVERFLOW = "clamp" # "clamp" serves PAGE_SIZE_CAP items; "error" answers HTTP 400 like Tableau
+GRAPHQL_BATCH_NODES = 1000  # Nodes per chunk when streaming Metadata API responses
+IMAGE_WIDTH = 320           # previewImage size in pixels
+IMAGE_HEIGHT = 240
+REST_API_VERSION = "3.25"
+VERBOSE = False             # Log every request line
+
+# ==============================
+# LIBRARIES
+# ==============================
+
+import argparse
+import json
+import random
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape, quoteattr
+
+# ==============================
+# LOGGING
+# ==============================
+
+def print_progress(message: str):
+    print(f"[PROGRESS] {message}", flush=True)
+
+# ==============================
+# IDS & TIMESTAMPS
+# ==============================
+
+# Ids encode (kind, site, index) so any id handed out can be resolved back to
+# the item without keeping a million objects in memory.
+KIND_CODES = {
+    'site': 1, 'user': 2, 'group': 3, 'project': 4, 'workbook': 5, 'view': 6,
+    'datasource': 7, 'flow': 8, 'virtualConnection': 9, 'subscription': 10,
+    'table': 11, 'database': 12, 'connection': 13, 'schedule': 14, 'token': 15
+}
+KIND_NAMES = {code: kind for kind, code in KIND_CODES.items()}
+
+BASE_TIMESTAMP = 1704067200  # 2024-01-01T00:00:00Z
+
+def make_id(kind: str, site: int, index: int) -> str:
+    return f"{KIND_CODES[kind]:08x}-{site:04x}-4000-8000-{index:012x}"
+
+def parse_id(value: str):
+    """(kind, site, index) for an id produced by make_id, else None."""
+    parts = value.split('-')
+    if len(parts) != 5:
+        return None
+    try:
+        kind = KIND_NAMES.get(int(parts[0], 16))
+        return (kind, int(parts[1], 16), int(parts[4], 16)) if kind else None
+    except ValueError:
+        return None
+
+def mix(*values) -> int:
+    """Cheap deterministic 32-bit hash; hashlib is too slow for 1M items."""
+    h = 0x811C9DC5
+    for v in values:
+        h = ((h ^ (v & 0xFFFFFFFF)) * 0x01000193) & 0xFFFFFFFF
+        h ^= h >> 15
+        h = (h * 0x2C1B3C6D) & 0xFFFFFFFF
+        h ^= h >> 12
+    return h
+
+def iso(ts: int) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+# ==============================
+# SYNTHETIC SITE
+# ==============================
+
+SITE_ROLES = ['SiteAdministratorCreator', 'Creator', 'Creator', 'Explorer', 'Explorer',
+              'ExplorerCanPublish', 'Viewer', 'Viewer', 'Viewer', 'Unlicensed']
+CONNECTION_TYPES = ['snowflake', 'sqlserver', 'postgres', 'excel-direct', 'textscan']
+CAPABILITIES = {
+    'workbook': ['Read', 'Filter', 'ViewComments', 'AddComment', 'ExportImage', 'ExportData', 'ViewUnderlyingData', 'Write'],
+    'view': ['Read', 'Filter', 'ExportImage', 'ExportData'],
+    'datasource': ['Read', 'Connect', 'ExportXml', 'Write'],
+    'flow': ['Read', 'ExportXml', 'Execute', 'Write'],
+    'virtualConnection': ['Read', 'Connect', 'Write'],
+    'project': ['Read', 'Write', 'ProjectLeader'],
+    'database': ['Read', 'Write'],
+    'table': ['Read', 'Write']
+}
+CONTENT_PATHS = {
+    'users': 'user', 'groups': 'group', 'projects': 'project', 'workbooks': 'workbook',
+    'views': 'view', 'datasources': 'datasource', 'flows': 'flow',
+    'virtualconnections': 'virtualConnection', 'subscriptions': 'subscription',
+    'databases': 'database', 'tables': 'table'
+}
+
+def _attrs(attrs: dict) -> str:
+    return ''.join(f' {k}={quoteattr(str(v))}' for k, v in attrs.items() if v is not None)
+
+def el(tag: str, attrs: dict = None, children: str = '') -> str:
+    if children:
+        return f'<{tag}{_attrs(attrs or {})}>{children}</{tag}>'
+    return f'<{tag}{_attrs(attrs or {})}/>'
+
+class SyntheticSite:
+    """
+    One generated site. Counts scale with the item budget; every element is
+    built on demand from its index so paging through 1M items is cheap.
+    """
+
+    def __init__(self, index: int, items: int, seed: int, epoch: int, churn_percent: float):
+        self.index = index
+        self.seed = seed
+        self.epoch = epoch
+        self.churn = int(churn_percent * 100)
+        n = max(items, 1)
+        workbooks = max(1, n * 25 // 100)
+        self.counts = {
+            'workbook': workbooks,
+            'view': workbooks * 2,
+            'datasource': max(1, n * 15 // 100),
+            'flow': max(1, n * 6 // 100),
+            'virtualConnection': max(1, n * 4 // 100),
+            'user': max(3, n // 10),
+            'group': max(2, n // 200),
+            'project': max(2, n // 40),
+            'subscription': max(1, n // 20),
+            'table': max(1, n // 5),
+            'database': max(1, n // 100)
+        }
+        self.content_url = '' if index == 0 else f'site{index}'
+        self.name = 'Default' if index == 0 else f'Site {index}'
+        self.id = make_id('site', index, 0)
+
+    # --- identity / time -------------------------------------------------
+
+    def id_of(self, kind: str, i: int) -> str:
+        return make_id(kind, self.index, i)
+
+    def resolve(self, kind: str, item_id: str):
+        """Index of item_id if it is a live `kind` on this site, else None."""
+        parsed = parse_id(item_id)
+        if parsed is None:
+            return None
+        k, site, i = parsed
+        if k != kind or site != self.index or i >= self.counts.get(kind, 0):
+            return None
+        return i
+
+    def h(self, kind: str, i: int, salt: int = 0) -> int:
+        return mix(self.seed, self.index, KIND_CODES[kind], i, salt)
+
+    def last_change_epoch(self, kind: str, i: int) -> int:
+        for e in range(self.epoch, 0, -1):
+            if self.h(kind, i, 1000 + e) % 10000 < self.churn:
+                return e
+        return 0
+
+    def created_at(self, kind: str, i: int) -> int:
+        return BASE_TIMESTAMP + self.h(kind, i) % (365 * 86400)
+
+    def updated_at(self, kind: str, i: int) -> int:
+        created = self.created_at(kind, i)
+        return created + (self.h(kind, i, 1) % (30 * 86400)) + self.last_change_epoch(kind, i) * 7 * 86400
+
+    # --- relationships ----------------------------------------------------
+
+    def project_of(self, kind: str, i: int) -> int:
+        return self.h(kind, i, 2) % self.counts['project']
+
+    def owner_of(self, kind: str, i: int) -> int:
+        # Workbooks are owned round-robin so /users/{id}/workbooks is a stride
+        if kind == 'workbook':
+            return i % self.counts['user']
+        return self.h(kind, i, 3) % self.counts['user']
+
+    def group_of_user(self, u: int) -> int:
+        return u % self.counts['group']
+
+    def parent_project(self, p: int):
+        return None if p < 4 else (p - 4) // 4
+
+    def upstream_tables(self, kind: str, i: int) -> list:
+        t = self.counts['table']
+        first = self.h(kind, i, 4) % t
+        if i % 2:
+            return [first, (first + 1 + self.h(kind, i, 5) % max(t - 1, 1)) % t] if t > 1 else [first]
+        return [first]
+
+    # --- element builders -------------------------------------------------
+
+    def _project_ref(self, p: int) -> str:
+        return el('project', {'id': self.id_of('project', p), 'name': f'Project {p:06d}'})
+
+    def _owner_ref(self, u: int) -> str:
+        return el('owner', {'id': self.id_of('user', u), 'name': f'user{u:06d}@example.com'})
+
+    def _tags(self, kind: str, i: int) -> str:
+        tags = [f'tag{self.h(kind, i, 6) % 7}']
+        if i % 3 == 0:
+            tags.append('certified')
+        return el('tags', None, ''.join(el('tag', {'label': t}) for t in tags))
+
+    def _times(self, kind: str, i: int) -> dict:
+        return {'createdAt': iso(self.created_at(kind, i)), 'updatedAt': iso(self.updated_at(kind, i))}
+
+    def site_element(self) -> str:
+        return el('site', {'id': self.id, 'name': self.name, 'contentUrl': self.content_url,
+                           'adminMode': 'ContentAndUsers', 'state': 'Active', 'revisionHistoryEnabled': 'true',
+                           'userQuota': '-1', 'storageQuota': '1000000'})
+
+    def user(self, u: int) -> str:
+        last_login = BASE_TIMESTAMP + self.h('user', u, 7) % (365 * 86400)
+        return el('user', {'id': self.id_of('user', u), 'name': f'user{u:06d}@example.com',
+                           'fullName': f'User {u:06d}', 'email': f'user{u:06d}@example.com',
+                           'siteRole': SITE_ROLES[u % len(SITE_ROLES)], 'lastLogin': iso(last_login),
+                           'authSetting': 'SAML', 'language': 'en', 'locale': 'en_US', 'externalAuthUserId': ''})
+
+    def group(self, g: int) -> str:
+        return el('group', {'id': self.id_of('group', g), 'name': 'All Users' if g == 0 else f'Group {g:05d}',
+                            'minimumSiteRole': None}, el('domain', {'name': 'local'}))
+
+    def project(self, p: int) -> str:
+        parent = self.parent_project(p)
+        attrs = {'id': self.id_of('project', p), 'name': f'Project {p:06d}', 'description': '',
+                 'contentPermissions': 'LockedToProject' if p % 10 == 0 else 'ManagedByOwner',
+                 'parentProjectId': self.id_of('project', parent) if parent is not None else None}
+        attrs.update(self._times('project', p))
+        return el('project', attrs, self._owner_ref(self.owner_of('project', p)))
+
+    def workbook(self, w: int, detail: bool = False) -> str:
+        attrs = {'id': self.id_of('workbook', w), 'name': f'Workbook {w:06d}', 'description': '',
+                 'contentUrl': f'Workbook{w:06d}', 'webpageUrl': f'https://mock.local/#/workbooks/{w}',
+                 'showTabs': 'true' if w % 2 else 'false', 'size': str(1 + self.h('workbook', w, 8) % 50),
+                 'encryptExtracts': 'false', 'defaultViewId': self.id_of('view', w * 2)}
+        attrs.update(self._times('workbook', w))
+        children = (self._project_ref(self.project_of('workbook', w)) + self._owner_ref(self.owner_of('workbook', w))
+                    + self._tags('workbook', w))
+        if detail:
+            children += el('views', None, ''.join(el('view', {'id': self.id_of('view', v), 'name': f'View {v:06d}'})
+                                                  for v in (w * 2, w * 2 + 1)))
+        return el('workbook', attrs, children)
+
+    def workbook_for_user(self, w: int) -> str:
+        # users/{id}/workbooks flattens project/owner into attributes
+        p = self.project_of('workbook', w)
+        attrs = {'id': self.id_of('workbook', w), 'name': f'Workbook {w:06d}', 'contentUrl': f'Workbook{w:06d}',
+                 'projectId': self.id_of('project', p), 'projectName': f'Project {p:06d}',
+                 'ownerId': self.id_of('user', self.owner_of('workbook', w))}
+        attrs.update(self._times('workbook', w))
+        return el('workbook', attrs)
+
+    def view(self, v: int) -> str:
+        w = v // 2
+        attrs = {'id': self.id_of('view', v), 'name': f'View {v:06d}', 'contentUrl': f'Workbook{w:06d}/sheets/View{v:06d}',
+                 'viewUrlName': f'View{v:06d}', 'sheetType': 'dashboard' if v % 2 == 0 else 'view'}
+        attrs.update(self._times('view', v))
+        children = (el('workbook', {'id': self.id_of('workbook', w)}) + self._owner_ref(self.owner_of('workbook', w))
+                    + self._project_ref(self.project_of('workbook', w)) + self._tags('view', v))
+        return el('view', attrs, children)
+
+    def datasource(self, d: int) -> str:
+        attrs = {'id': self.id_of('datasource', d), 'name': f'Datasource {d:06d}', 'contentUrl': f'Datasource{d:06d}',
+                 'type': CONNECTION_TYPES[d % len(CONNECTION_TYPES)], 'hasExtracts': 'true' if d % 3 == 0 else 'false',
+                 'isCertified': 'true' if d % 5 == 0 else 'false', 'useRemoteQueryAgent': 'false',
+                 'encryptExtracts': 'false', 'description': ''}
+        attrs.update(self._times('datasource', d))
+        children = (self._project_ref(self.project_of('datasource', d)) + self._owner_ref(self.owner_of('datasource', d))
+                    + self._tags('datasource', d))
+        return el('datasource', attrs, children)
+
+    def flow(self, f: int) -> str:
+        attrs = {'id': self.id_of('flow', f), 'name': f'Flow {f:06d}', 'description': '',
+                 'webpageUrl': f'https://mock.local/#/flows/{f}', 'fileType': 'tflx'}
+        attrs.update(self._times('flow', f))
+        children = (self._project_ref(self.project_of('flow', f)) + self._owner_ref(self.owner_of('flow', f))
+                    + self._tags('flow', f))
+        return el('flow', attrs, children)
+
+    def virtual_connection(self, c: int) -> str:
+        attrs = {'id': self.id_of('virtualConnection', c), 'name': f'Virtual Connection {c:05d}',
+                 'isCertified': 'false', 'hasExtracts': 'false',
+                 'webpageUrl': f'https://mock.local/#/virtualconnections/{c}'}
+        attrs.update(self._times('virtualConnection', c))
+        children = (self._project_ref(self.project_of('virtualConnection', c))
+                    + self._owner_ref(self.owner_of('virtualConnection', c)))
+        return el('virtualConnection', attrs, children)
+
+    def subscription(self, s: int) -> str:
+        v = self.h('subscription', s, 9) % self.counts['view']
+        u = self.h('subscription', s, 10) % self.counts['user']
+        attrs = {'id': self.id_of('subscription', s), 'subject': f'Subscription {s:06d}', 'attachImage': 'true',
+                 'attachPdf': 'false', 'suspended': 'false', 'message': ''}
+        children = (el('content', {'id': self.id_of('view', v), 'type': 'View', 'sendIfViewEmpty': 'true'})
+                    + el('schedule', {'id': self.id_of('schedule', s % 12), 'name': f'Schedule {s % 12:02d}'})
+                    + el('user', {'id': self.id_of('user', u), 'name': f'user{u:06d}@example.com'}))
+        return el('subscription', attrs, children)
+
+    def personal_access_tokens(self, u: int) -> str:
+        tokens = []
+        for n in range(u % 4):
+            used = BASE_TIMESTAMP + self.h('token', u, n) % (365 * 86400)
+            tokens.append(el('personalAccessToken', {
+                'tokenName': f'token-{u}-{n}', 'tokenGuid': self.id_of('token', u * 4 + n),
+                'lastUsedAt': iso(used), 'expiresAt': iso(used + 180 * 86400)}))
+        return el('personalAccessTokens', None, ''.join(tokens))
+
+    def favorites(self, u: int) -> str:
+        w = self.h('user', u, 11) % self.counts['workbook']
+        v = self.h('user', u, 12) % self.counts['view']
+        d = self.h('user', u, 13) % self.counts['datasource']
+        favs = [
+            el('favorite', {'label': f'Workbook {w:06d}'},
+               el('workbook', {'id': self.id_of('workbook', w)}, self._project_ref(self.project_of('workbook', w)))),
+            el('favorite', {'label': f'View {v:06d}'},
+               el('view', {'id': self.id_of('view', v)},
+                  el('workbook', {'id': self.id_of('workbook', v // 2)},
+                     self._project_ref(self.project_of('workbook', v // 2))))),
+            el('favorite', {'label': f'Datasource {d:06d}'},
+               el('datasource', {'id': self.id_of('datasource', d)}, self._project_ref(self.project_of('datasource', d))))
+        ]
+        if u % 2:
+            p = self.h('user', u, 14) % self.counts['project']
+            favs.append(el('favorite', {'label': f'Project {p:06d}'}, self._project_ref(p)))
+        return el('favorites', None, ''.join(favs))
+
+    def _grantee(self, kind: str, i: int, grantee_kind: str, grantee: int, caps: list, deny: bool = False) -> str:
+        cap_xml = ''.join(el('capability', {'name': c, 'mode': 'Deny' if deny else 'Allow'}) for c in caps)
+        return el('granteeCapabilities', None,
+                  el(grantee_kind, {'id': self.id_of(grantee_kind, grantee)}) + el('capabilities', None, cap_xml))
+
+    def permissions(self, kind: str, i: int) -> str:
+        caps = CAPABILITIES[kind]
+        body = el(kind, {'id': self.id_of(kind, i)})
+        body += self._grantee(kind, i, 'group', self.h(kind, i, 15) % self.counts['group'], caps[:2])
+        if i % 4 == 0:
+            body += self._grantee(kind, i, 'group', 0, caps[:1])
+        if i % 5 == 0:
+            body += self._grantee(kind, i, 'user', self.h(kind, i, 16) % self.counts['user'], caps[-1:], deny=True)
+        return el('permissions', None, body)
+
+    def default_permissions(self, p: int, kind: str) -> str:
+        caps = CAPABILITIES[kind]
+        body = self._grantee('project', p, 'group', 0, caps[:1])
+        body += self._grantee('project', p, 'group', self.h('project', p, 17) % self.counts['group'], caps[:3])
+        return el('permissions', None, body)
+
+    def connections(self, kind: str, i: int) -> str:
+        conns = []
+        for n in range(1 + i % 2):
+            table = self.upstream_tables(kind, i)[0]
+            db = table % self.counts['database']
+            ctype = CONNECTION_TYPES[db % len(CONNECTION_TYPES)]
+            cid = self.id_of('connection', (KIND_CODES[kind] << 32) + i * 4 + n)
+            if kind == 'virtualConnection':
+                conns.append(el('connection', {'connectionId': cid, 'dbClass': ctype, 'server': f'db{db:04d}.example.com',
+                                               'port': '443', 'username': f'svc_{db:04d}'}))
+                continue
+            attrs = {'id': cid, 'type': ctype, 'serverAddress': f'db{db:04d}.example.com', 'serverPort': '443',
+                     'userName': f'svc_{db:04d}', 'embedPassword': 'true', 'queryTaggingEnabled': 'false'}
+            child = ''
+            if kind == 'workbook':
+                d = self.h(kind, i, 18 + n) % self.counts['datasource']
+                child = el('datasource', {'id': self.id_of('datasource', d), 'name': f'Datasource {d:06d}'})
+            conns.append(el('connection', attrs, child))
+        wrapper = 'virtualConnectionConnections' if kind == 'virtualConnection' else 'connections'
+        return el(wrapper, None, ''.join(conns))
+
+    def detail(self, kind: str, i: int) -> str:
+        builders = {'user': self.user, 'group': self.group, 'project': self.project, 'view': self.view,
+                    'workbook': lambda w: self.workbook(w, detail=True), 'datasource': self.datasource,
+                    'flow': self.flow, 'virtualConnection': self.virtual_connection}
+        return builders[kind](i)
+
+    # --- metadata API -----------------------------------------------------
+
+    def lineage_node(self, kind: str, i: int) -> dict:
+        names = {'datasource': 'Datasource', 'flow': 'Flow', 'virtualConnection': 'Virtual Connection', 'workbook': 'Workbook'}
+        node = {'id': self.id_of(kind, i), 'luid': self.id_of(kind, i), 'name': f'{names[kind]} {i:06d}'}
+        if kind == 'datasource':
+            node['hasExtracts'] = i % 3 == 0
+            node['extractLastRefreshTime'] = iso(self.updated_at(kind, i)) if i % 3 == 0 else None
+        node['upstreamTables'] = [{'id': self.id_of('table', t)} for t in self.upstream_tables(kind, i)]
+        return node
+
+    def table_node(self, t: int) -> dict:
+        db = t % self.counts['database']
+        schema = f'SCHEMA_{t % 20:02d}'
+        return {'id': self.id_of('table', t), 'name': f'TABLE_{t:06d}', 'schema': schema,
+                'fullName': f'[{schema}].[TABLE_{t:06d}]',
+                'database': {'id': self.id_of('database', db), 'name': f'DATABASE_{db:04d}',
+                             'connectionType': CONNECTION_TYPES[db % len(CONNECTION_TYPES)]}}
+
+    # --- preview images ---------------------------------------------------
+
+    def image_variant(self, v: int) -> int:
+        return self.h('view', v, 19 + self.last_change_epoch('view', v)) % 64
+
+# ==============================
+# PNG
+# ==============================
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+def make_png(width: int, height: int, variant: int) -> bytes:
+    """Gradient PNG whose colours depend on variant, so views get distinct images."""
+    r0, g0, b0 = (variant * 37) % 256, (variant * 91) % 256, (variant * 53) % 256
+    rows = []
+    for y in range(height):
+        row = bytearray(b'\x00')
+        g = (g0 + y * 255 // max(height - 1, 1)) % 256
+        for x in range(width):
+            row += bytes(((r0 + x * 255 // max(width - 1, 1)) % 256, g, b0))
+        rows.append(bytes(row))
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + _png_chunk(b'IHDR', header)
+            + _png_chunk(b'IDAT', zlib.compress(b''.join(rows), 6)) + _png_chunk(b'IEND', b''))
+
+# ==============================
+# FAULT INJECTION
+# ==============================
+
+class TokenBucket:
+    """Requests over `rate`/s (with a one-second burst) are refused."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+class MockStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.requests = 0
+            self.throttled = 0
+            self.errors = 0
+            self.bytes_sent = 0
+            self.routes = {}
+
+    def record(self, route: str, status: int, size: int):
+        with self.lock:
+            self.requests += 1
+            self.bytes_sent += size
+            if status == 429:
+                self.throttled += 1
+            elif status >= 500:
+                self.errors += 1
+            self.routes[route] = self.routes.get(route, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {'requests': self.requests, 'throttled': self.throttled, 'errors': self.errors,
+                    'bytesSent': self.bytes_sent, 'elapsedSeconds': round(time.time() - self.started, 3),
+                    'routes': dict(self.routes)}
+
+# ==============================
+# HTTP HANDLER
+# ==============================
+
+NS = 'http://tableau.com/api'
+SITE_PATH = r'^/api/[\d.]+/sites/(?P<site>[^/]+)'
+
+ROUTES = [
+    ('serverinfo', 'GET', r'^/api/[\d.]+/serverinfo$'),
+    ('signin', 'POST', r'^/api/[\d.]+/auth/signin$'),
+    ('signout', 'POST', r'^/api/[\d.]+/auth/signout$'),
+    ('switchsite', 'POST', r'^/api/[\d.]+/auth/switchSite$'),
+    ('graphql', 'POST', r'^/api/metadata/graphql$'),
+    ('stats', 'GET', r'^/__mock/stats$'),
+    ('stats_reset', 'POST', r'^/__mock/stats/reset$'),
+    ('sites', 'GET', r'^/api/[\d.]+/sites$'),
+    ('group_users', 'GET', SITE_PATH + r'/groups/(?P<id>[^/]+)/users$'),
+    ('user_workbooks', 'GET', SITE_PATH + r'/users/(?P<id>[^/]+)/workbooks$'),
+    ('pats', 'GET', SITE_PATH + r'/users/(?P<id>[^/]+)/personal-access-tokens$'),
+    ('favorites', 'GET', SITE_PATH + r'/favorites/(?P<id>[^/]+)$'),
+    ('default_permissions', 'GET', SITE_PATH + r'/projects/(?P<id>[^/]+)/default-permissions/(?P<kind>[^/]+)$'),
+    ('permissions', 'GET', SITE_PATH + r'/(?P<kind>[^/]+)/(?P<id>[^/]+)/permissions$'),
+    ('connections', 'GET', SITE_PATH + r'/(?P<kind>[^/]+)/(?P<id>[^/]+)/connections$'),
+    ('preview_image', 'GET', SITE_PATH + r'/workbooks/(?P<wid>[^/]+)/views/(?P<id>[^/]+)/previewImage$'),
+    ('listing', 'GET', SITE_PATH + r'/(?P<kind>[^/]+)$'),
+    ('detail', 'GET', SITE_PATH + r'/(?P<kind>[^/]+)/(?P<id>[^/]+)$'),
+    ('site', 'GET', SITE_PATH + r'$')
+]
+ROUTES = [(name, method, re.compile(pattern)) for name, method, pattern in ROUTES]
+
+class MockTableauHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'MockTableau/1.0'
+
+    # --- plumbing ---------------------------------------------------------
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def log_message(self, format, *args):
+        if self.server.config.verbose:
+            super().log_message(format, *args)
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def send(self, status: int, body: bytes, content_type: str = 'application/xml;charset=utf-8', headers: dict = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+        self.server.stats.record(self.route, status, len(body))
+
+    def send_xml(self, inner: str, status: int = 200):
+        self.send(status, f'<?xml version="1.0" encoding="UTF-8"?><tsResponse xmlns="{NS}">{inner}</tsResponse>'.encode('utf-8'))
+
+    def send_error_xml(self, status: int, code: str, summary: str, detail: str = '', headers: dict = None):
+        body = el('error', {'code': code}, f'<summary>{escape(summary)}</summary><detail>{escape(detail)}</detail>')
+        self.send(status, f'<?xml version="1.0" encoding="UTF-8"?><tsResponse xmlns="{NS}">{body}</tsResponse>'.encode('utf-8'),
+                  headers=headers)
+
+    def send_chunked(self, pieces):
+        """Stream an iterable of str with chunked transfer encoding."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        size = 0
+        for piece in pieces:
+            data = piece.encode('utf-8')
+            if data:
+                self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+                size += len(data)
+        self.wfile.write(b'0\r\n\r\n')
+        self.server.stats.record(self.route, 200, size)
+
+    def dispatch(self, method: str):
+        config = self.server.config
+        parts = urlsplit(self.path)
+        self.query = parse_qs(parts.query)
+        self.route = 'unknown'
+        match = None
+        for name, route_method, pattern in ROUTES:
+            match = pattern.match(parts.path)
+            if match and route_method == method:
+                self.route = name
+                break
+        else:
+            match = None
+
+        delay = config.latency_ms + (random.uniform(0, config.jitter_ms) if config.jitter_ms else 0)
+        if delay and not self.route.startswith('stats'):
+            time.sleep(delay / 1000.0)
+
+        if match is None:
+            self.read_body()
+            self.send_error_xml(404, '404000', 'Resource Not Found', f'No mock route for {method} {parts.path}')
+            return
+        if not self.route.startswith('stats') and self.inject_fault():
+            return
+        try:
+            getattr(self, f'handle_{self.route}')(**match.groupdict())
+        except BrokenPipeError:
+            pass
+
+    def inject_fault(self) -> bool:
+        config = self.server.config
+        retry_after = {'Retry-After': str(config.retry_after)}
+        if self.server.bucket is not None and not self.server.bucket.take():
+            self.read_body()
+            self.send_error_xml(429, '429000', 'Too Many Requests', 'Request rate limit exceeded', retry_after)
+            return True
+        if config.throttle_rate and random.random() < config.throttle_rate:
+            self.read_body()
+            self.send_error_xml(429, '429000', 'Too Many Requests', 'Injected throttle', retry_after)
+            return True
+        if config.error_rate and random.random() < config.error_rate:
+            self.read_body()
+            self.send_error_xml(500, '500000', 'Internal Server Error', 'Injected failure')
+            return True
+        return False
+
+    # --- auth & lookups ---------------------------------------------------
+
+    def session_site(self):
+        token = self.headers.get('X-Tableau-Auth', '')
+        with self.server.lock:
+            return self.server.tokens.get(token)
+
+    def require_site(self, site_id: str):
+        """SyntheticSite for the path's site id after checking the token; None once an error is sent."""
+        if self.session_site() is None:
+            self.send_error_xml(401, '401002', 'Unauthorized Access', 'Invalid authentication credentials were provided.')
+            return None
+        parsed = parse_id(site_id)
+        if parsed is None or parsed[0] != 'site' or parsed[1] >= len(self.server.sites):
+            self.send_error_xml(404, '404000', 'Site not found', site_id)
+            return None
+        return self.server.sites[parsed[1]]
+
+    def require_item(self, site: SyntheticSite, kind: str, item_id: str):
+        i = site.resolve(kind, item_id)
+        if i is None:
+            self.send_error_xml(404, '404000', 'Resource Not Found', f'{kind} {item_id}')
+        return i
+
+    def issue_token(self, site: SyntheticSite) -> str:
+        with self.server.lock:
+            self.server.token_counter += 1
+            token = f'mock|{site.index}|{self.server.token_counter:08d}'
+            self.server.tokens[token] = site.index
+        return token
+
+    def site_for_content_url(self, body: bytes) -> SyntheticSite:
+        m = re.search(rb'<site[^>]*contentUrl="([^"]*)"', body)
+        content_url = m.group(1).decode('utf-8') if m else ''
+        for site in self.server.sites:
+            if site.content_url == content_url:
+                return site
+        # Unknown content URLs (e.g. the placeholder in USER VARIABLES) land on the default site
+        return self.server.sites[0]
+
+    def credentials_xml(self, site: SyntheticSite, token: str) -> str:
+        return el('credentials', {'token': token, 'estimatedTimeToExpiration': '239:59:59'},
+                  el('site', {'id': site.id, 'contentUrl': site.content_url})
+                  + el('user', {'id': site.id_of('user', 0)}))
+
+    def handle_serverinfo(self):
+        self.send_xml(el('serverInfo', None,
+                         '<productVersion build="20251.0.0">2025.1</productVersion>'
+                         f'<restApiVersion>{self.server.config.api_version}</restApiVersion>'))
+
+    def handle_signin(self):
+        site = self.site_for_content_url(self.read_body())
+        self.send_xml(self.credentials_xml(site, self.issue_token(site)))
+
+    def handle_switchsite(self):
+        body = self.read_body()
+        if self.session_site() is None:
+            self.send_error_xml(401, '401002', 'Unauthorized Access', 'Invalid authentication credentials were provided.')
+            return
+        site = self.site_for_content_url(body)
+        self.send_xml(self.credentials_xml(site, self.issue_token(site)))
+
+    def handle_signout(self):
+        self.read_body()
+        with self.server.lock:
+            self.server.tokens.pop(self.headers.get('X-Tableau-Auth', ''), None)
+        self.send(204, b'')
+
+    # --- pagination -------------------------------------------------------
+
+    def page_bounds(self, total: int):
+        """(page_number, page_size, start, stop) or None once a 400 is sent."""
+        config = self.server.config
+        try:
+            size = int(self.query.get('pageSize', [config.default_page_size])[0])
+            number = max(1, int(self.query.get('pageNumber', ['1'])[0]))
+        except ValueError:
+            self.send_error_xml(400, '400006', 'Bad Request', 'pageSize and pageNumber must be integers')
+            return None
+        if size > config.page_size_cap:
+            if config.page_size_overflow == 'error':
+                self.send_error_xml(400, '400006', 'Bad Request', f'pageSize must be at most {config.page_size_cap}')
+                return None
+            size = config.page_size_cap
+        size = max(1, size)
+        start = min((number - 1) * size, total)
+        return number, size, start, min(start + size, total)
+
+    def send_page(self, wrapper: str, total: int, build, index_at=None):
+        bounds = self.page_bounds(total)
+        if bounds is None:
+            return
+        number, size, start, stop = bounds
+        items = ''.join(build(index_at(k) if index_at else k) for k in range(start, stop))
+        pagination = el('pagination', {'pageNumber': number, 'pageSize': size, 'totalAvailable': total})
+        self.send_xml(pagination + f'<{wrapper}>{items}</{wrapper}>')
+
+    # --- REST endpoints ---------------------------------------------------
+
+    def handle_sites(self):
+        if self.session_site() is None:
+            self.send_error_xml(401, '401002', 'Unauthorized Access', 'Invalid authentication credentials were provided.')
+            return
+        sites = self.server.sites
+        self.send_page('sites', len(sites), lambda i: sites[i].site_element())
+
+    def handle_site(self, site):
+        s = self.require_site(site)
+        if s is not None:
+            self.send_xml(s.site_element())
+
+    def handle_listing(self, site, kind):
+        s = self.require_site(site)
+        if s is None:
+            return
+        item_kind = CONTENT_PATHS.get(kind.lower())
+        builders = {'user': s.user, 'group': s.group, 'project': s.project, 'workbook': s.workbook,
+                    'view': s.view, 'datasource': s.datasource, 'flow': s.flow,
+                    'virtualConnection': s.virtual_connection, 'subscription': s.subscription}
+        if item_kind not in builders:
+            self.send_error_xml(404, '404000', 'Resource Not Found', kind)
+            return
+        self.send_page(f'{item_kind}s', s.counts[item_kind], builders[item_kind])
+
+    def handle_detail(self, site, kind, id):
+        s = self.require_site(site)
+        if s is None:
+            return
+        item_kind = CONTENT_PATHS.get(kind.lower())
+        if item_kind in (None, 'subscription', 'database', 'table'):
+            self.send_error_xml(404, '404000', 'Resource Not Found', kind)
+            return
+        i = self.require_item(s, item_kind, id)
+        if i is not None:
+            self.send_xml(s.detail(item_kind, i))
+
+    def handle_group_users(self, site, id):
+        s = self.require_site(site)
+        if s is None:
+            return
+        g = self.require_item(s, 'group', id)
+        if g is None:
+            return
+        groups = s.counts['group']
+        if g == 0:  # All Users
+            self.send_page('users', s.counts['user'], s.user)
+        else:
+            members = range(g, s.counts['user'], groups)
+            self.send_page('users', len(members), s.user, lambda k: members[k])
+
+    def handle_user_workbooks(self, site, id):
+        s = self.require_site(site)
+        if s is None:
+            return
+        u = self.require_item(s, 'user', id)
+        if u is not None:
+            owned = range(u, s.counts['workbook'], s.counts['user'])
+            self.send_page('workbooks', len(owned), s.workbook_for_user, lambda k: owned[k])
+
+    def handle_pats(self, site, id):
+        s = self.require_site(site)
+        if s is None:
+            return
+        u = self.require_item(s, 'user', id)
+        if u is not None:
+            self.send_xml(s.personal_access_tokens(u))
+
+    def handle_favorites(self, site, id):
+        s = self.require_site(site)
+        if s is None:
+            return
+        u = self.require_item(s, 'user', id)
+        if u is not None:
+            self.send_xml(s.favorites(u))
+
+    def handle_permissions(self, site, kind, id):
+        s = self.require_site(site)
+        if s is None:
+            return
+        item_kind = CONTENT_PATHS.get(kind.lower())
+        if item_kind not in CAPABILITIES:
+            self.send_error_xml(404, '404000', 'Resource Not Found', kind)
+            return
+        i = self.require_item(s, item_kind, id)
+        if i is not None:
+            self.send_xml(s.permissions(item_kind, i))
+
+    def handle_default_permissions(self, site, id, kind):
+        s = self.require_site(site)
+        if s is None:
+            return
+        p = self.require_item(s, 'project', id)
+        if p is None:
+            return
+        item_kind = CONTENT_PATHS.get(kind.lower())
+        if item_kind not in CAPABILITIES:
+            self.send_error_xml(404, '404000', 'Resource Not Found', kind)
+            return
+        self.send_xml(s.default_permissions(p, item_kind))
+
+    def handle_connections(self, site, kind, id):
+        s = self.require_site(site)
+        if s is None:
+            return
+        item_kind = CONTENT_PATHS.get(kind.lower())
+        if item_kind not in ('workbook', 'datasource', 'flow', 'virtualConnection'):
+            self.send_error_xml(404, '404000', 'Resource Not Found', kind)
+            return
+        i = self.require_item(s, item_kind, id)
+        if i is not None:
+            self.send_xml(s.connections(item_kind, i))
+
+    def handle_preview_image(self, site, wid, id):
+        s = self.require_site(site)
+        if s is None:
+            return
+        v = self.require_item(s, 'view', id)
+        if v is None:
+            return
+        variant = s.image_variant(v)
+        etag = f'"{s.id_of("view", v)}-{variant:02x}"'
+        headers = {'ETag': etag, 'Last-Modified': datetime.fromtimestamp(s.updated_at('view', v), timezone.utc)
+                   .strftime('%a, %d %b %Y %H:%M:%S GMT')}
+        if self.headers.get('If-None-Match') == etag:
+            self.send(304, b'', headers=headers)
+            return
+        self.send(200, self.server.image(variant), content_type='image/png', headers=headers)
+
+    # --- metadata API -----------------------------------------------------
+
+    def handle_graphql(self):
+        try:
+            payload = json.loads(self.read_body() or b'{}')
+        except ValueError:
+            self.send(400, b'{"errors":[{"message":"Invalid JSON body"}]}', content_type='application/json')
+            return
+        site_index = self.session_site()
+        if site_index is None:
+            self.send(401, b'{"errors":[{"message":"Unauthorized"}]}', content_type='application/json')
+            return
+        s = self.server.sites[site_index]
+        query = payload.get('query') or ''
+        variables = payload.get('variables') or {}
+        batch = self.server.config.graphql_batch_nodes
+
+        if re.search(r'\bdatabaseTables\s*\(', query):
+            # idWithin is typed [ID] on the server; reject mismatched declarations as validation does.
+            declared = re.search(r'\$ids\s*:\s*([^\s,)=]+)', query)
+            if declared and declared.group(1).replace('!', '') != '[ID]':
+                message = (f'Variable "$ids" of type "{declared.group(1)}" used in position '
+                           f'expecting type "[ID]".')
+                self.send(200, json.dumps({'errors': [{'message': message}]}).encode('utf-8'),
+                          content_type='application/json')
+                return
+            ids = variables.get('ids') or []
+            tables = [t for t in (s.resolve('table', i) for i in ids) if t is not None]
+            roots = [('databaseTables', len(tables), lambda k: s.table_node(tables[k]))]
+        else:
+            roots = []
+            for root, kind in (('datasources', 'datasource'), ('flows', 'flow'),
+                               ('virtualConnections', 'virtualConnection'), ('workbooks', 'workbook')):
+                if re.search(rf'(^|[\s{{]){root}\s*[{{(]', query):
+                    roots.append((root, s.counts[kind], lambda k, kind=kind: s.lineage_node(kind, k)))
+        if not roots:
+            self.send(200, b'{"errors":[{"message":"Mock server does not implement this query"}]}',
+                      content_type='application/json')
+            return
+
+        def pieces():
+            yield '{"data":{'
+            for n, (root, total, build) in enumerate(roots):
+                yield ('' if n == 0 else ',') + json.dumps(root) + ':['
+                for start in range(0, total, batch):
+                    chunk = ','.join(json.dumps(build(k), separators=(',', ':')) for k in range(start, min(start + batch, total)))
+                    yield (',' if start else '') + chunk
+                yield ']'
+            yield '}}'
+
+        self.send_chunked(pieces())
+
+    # --- mock control -----------------------------------------------------
+
+    def handle_stats(self):
+        self.send(200, json.dumps(self.server.stats.snapshot()).encode('utf-8'), content_type='application/json')
+
+    def handle_stats_reset(self):
+        self.read_body()
+        self.send(204, b'')
+        self.server.stats.reset()
+
+# ==============================
+# SERVER
+# ==============================
+
+class MockTableauServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, config):
+        super().__init__((config.host, config.port), MockTableauHandler)
+        self.config = config
+        self.sites = [SyntheticSite(i, config.items, config.seed, config.epoch, config.churn_percent)
+                      for i in range(max(config.sites, 1))]
+        self.stats = MockStats()
+        self.bucket = TokenBucket(config.max_rps) if config.max_rps > 0 else None
+        self.lock = threading.Lock()
+        self.tokens = {}
+        self.token_counter = 0
+        self._images = {}
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections is normal; anything else is still reported
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def image(self, variant: int) -> bytes:
+        data = self._images.get(variant)
+        if data is None:
+            data = make_png(self.config.image_width, self.config.image_height, variant)
+            self._images[variant] = data
+        return data
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Local mock of the Tableau REST and Metadata APIs used by the GET scripts.")
+    p.add_argument('--host', default=HOST)
+    p.add_argument('--port', type=int, default=PORT, help='0 picks a free port')
+    p.add_argument('--sites', type=int, default=SITE_COUNT)
+    p.add_argument('--items', type=int, default=ITEMS_PER_SITE, help='content items per site')
+    p.add_argument('--seed', type=int, default=SEED)
+    p.add_argument('--epoch', type=int, default=EPOCH)
+    p.add_argument('--churn-percent', type=float, default=CHURN_PERCENT)
+    p.add_argument('--latency-ms', type=float, default=LATENCY_MS)
+    p.add_argument('--jitter-ms', type=float, default=JITTER_MS)
+    p.add_argument('--max-rps', type=float, default=MAX_REQUESTS_PER_SECOND)
+    p.add_argument('--throttle-rate', type=float, default=THROTTLE_RATE)
+    p.add_argument('--error-rate', type=float, default=ERROR_RATE)
+    p.add_argument('--retry-after', type=int, default=RETRY_AFTER_SECONDS)
+    p.add_argument('--default-page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    p.add_argument('--page-size-cap', type=int, default=PAGE_SIZE_CAP)
+    p.add_argument('--page-size-overflow', choices=['clamp', 'error'], default=PAGE_SIZE_OVERFLOW)
+    p.add_argument('--graphql-batch-nodes', type=int, default=GRAPHQL_BATCH_NODES)
+    p.add_argument('--image-width', type=int, default=IMAGE_WIDTH)
+    p.add_argument('--image-height', type=int, default=IMAGE_HEIGHT)
+    p.add_argument('--api-version', default=REST_API_VERSION)
+    p.add_argument('--verbose', action='store_true', default=VERBOSE)
+    return p
+
+def start_server(argv: list = None):
+    """Start a mock server on a background thread; returns the server (call .shutdown() when done)."""
+    config = build_parser().parse_args(argv or [])
+    server = MockTableauServer(config)
+    threading.Thread(target=server.serve_forever, name='mock-tableau', daemon=True).start()
+    return server
+
+# ==============================
+# MAIN
+# ==============================
+
+def main():
+    config = build_parser().parse_args()
+    server = MockTableauServer(config)
+    counts = ', '.join(f"{k}={v}" for k, v in server.sites[0].counts.items())
+    print_progress(f"Mock Tableau server listening on {server.url}")
+    print_progress(f"{len(server.sites)} site(s), each with {counts}")
+    print_progress(f"Set SERVER_URL = '{server.url}' in a GET script to run it against this server")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print_progress(f"Stopped. {json.dumps(server.stats.snapshot())}")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)